@@ -2,7 +2,7 @@ import os
 import gc
 from batch.utils.settings_check import check_settings
 from batch.utils.video_processor import process_video
-from core.utils.config_utils import load_key, update_key
+from core.utils.config_utils import load_key, update_key, freeze_config
 import pandas as pd
 from rich.console import Console
 from rich.panel import Panel
@@ -26,6 +26,9 @@ def process_batch():
     if not check_settings():
         raise Exception("Settings check failed")
 
+    # Resolve config once; per-task language overrides are applied to this snapshot
+    freeze_config()
+
     df = pd.read_excel('batch/tasks_setting.xlsx')
     for index, row in df.iterrows():
         if pd.isna(row['Status']) or 'Error' in str(row['Status']):
@@ -7,18 +7,17 @@ import pandas as pd
 from pydub import AudioSegment
 from rich.console import Console
 from rich.progress import Progress
-from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from core.utils import *
 from core.utils.models import *
 from core.asr_backend.audio_preprocess import get_audio_duration
-from core.tts_backend.tts_main import tts_main
+from core.tts_backend.scheduler import TTSScheduler, TTSUnit
+from core.tts_backend.calibration import record_tts_durations
 
 console = Console()
 
 TEMP_FILE_TEMPLATE = f"{_AUDIO_TMP_DIR}/{{}}_temp.wav"
 OUTPUT_FILE_TEMPLATE = f"{_AUDIO_SEGS_DIR}/{{}}.wav"
-WARMUP_SIZE = 5
 
 def parse_df_srt_time(time_str: str) -> float:
     """Convert SRT time format to seconds"""
@@ -26,14 +25,15 @@ def parse_df_srt_time(time_str: str) -> float:
     seconds, milliseconds = seconds.split('.')
     return int(hours) * 3600 + int(minutes) * 60 + int(seconds) + int(milliseconds) / 1000
 
-def adjust_audio_speed(input_file: str, output_file: str, speed_factor: float) -> None:
-    """Adjust audio speed and handle edge cases"""
+def adjust_audio_speed(input_file: str, output_file: str, speed_factor: float, input_duration: float = None) -> float:
+    """Adjust audio speed and handle edge cases; returns the output duration"""
+    if input_duration is None:
+        input_duration = get_audio_duration(input_file)
     # If the speed factor is close to 1, directly copy the file
     if abs(speed_factor - 1.0) < 0.001:
         shutil.copy2(input_file, output_file)
-        return
+        return input_duration
 
-    input_duration = get_audio_duration(input_file)
     max_retries = 2
     for attempt in range(max_retries):
         try:
@@ -55,10 +55,10 @@ def adjust_audio_speed(input_file: str, output_file: str, speed_factor: float) -
                 trimmed_audio = audio[:(expected_duration * 1000)]  # pydub uses milliseconds
                 trimmed_audio.export(output_file, format="wav")
                 print(f"✂️ Trimmed to expected duration: {expected_duration:.2f} seconds")
-                return
+                return len(trimmed_audio) / 1000
             elif output_duration >= expected_duration * 1.02:
                 raise Exception(f"Audio duration abnormal: input file={input_file}, output file={output_file}, speed factor={speed_factor}, input duration={input_duration:.2f}s, output duration={output_duration:.2f}s")
-            return
+            return output_duration
         except ffmpeg.Error as e:
             if attempt < max_retries - 1:
                 rprint(f"[yellow]⚠️ Audio speed adjustment failed, retrying in 1s ({attempt + 1}/{max_retries})[/yellow]")
@@ -67,54 +67,34 @@ def adjust_audio_speed(input_file: str, output_file: str, speed_factor: float) -
                 rprint(f"[red]❌ Audio speed adjustment failed, max retries reached ({max_retries})[/red]")
                 raise e
 
-def process_row(row: pd.Series, tasks_df: pd.DataFrame) -> tuple[int, float]:
-    """Helper function for processing single row data"""
-    number = row['number']
-    lines = eval(row['lines']) if isinstance(row['lines'], str) else row['lines']
-    real_dur = 0
-    for line_index, line in enumerate(lines):
-        temp_file = TEMP_FILE_TEMPLATE.format(f"{number}_{line_index}")
-        tts_main(line, temp_file, number, tasks_df)
-        real_dur += get_audio_duration(temp_file)
-    return number, real_dur
+def build_tts_units(tasks_df: pd.DataFrame) -> list[TTSUnit]:
+    """Flatten task rows into one unit per subtitle line"""
+    units = []
+    for number, lines in zip(tasks_df['number'], tasks_df['lines']):
+        lines = eval(lines) if isinstance(lines, str) else lines
+        for line_index, line in enumerate(lines):
+            units.append(TTSUnit(number, line_index, line, TEMP_FILE_TEMPLATE.format(f"{number}_{line_index}")))
+    return units
 
 def generate_tts_audio(tasks_df: pd.DataFrame) -> pd.DataFrame:
-    """Generate TTS audio sequentially and calculate actual duration"""
-    tasks_df['real_dur'] = 0.0
+    """Generate TTS audio for all lines concurrently and calculate actual duration"""
     rprint("[bold green]🎯 Starting TTS audio generation...[/bold green]")
-    
+    units = build_tts_units(tasks_df)
+
     with Progress() as progress:
-        task = progress.add_task("[cyan]🔄 Generating TTS audio...", total=len(tasks_df))
-        
-        # warm up for first 5 rows
-        warmup_size = min(WARMUP_SIZE, len(tasks_df))
-        for _, row in tasks_df.head(warmup_size).iterrows():
-            try:
-                number, real_dur = process_row(row, tasks_df)
-                tasks_df.loc[tasks_df['number'] == number, 'real_dur'] = real_dur
-                progress.advance(task)
-            except Exception as e:
-                rprint(f"[red]❌ Error in warmup: {str(e)}[/red]")
-                raise e
+        task = progress.add_task("[cyan]🔄 Generating TTS audio...", total=len(units))
+        results = TTSScheduler().run(units, on_done=lambda _: progress.advance(task))
+
+    line_durs = {}
+    for result in results:
+        line_durs.setdefault(result.number, []).append(result.duration)
+    # Per-line durations let the speed-change step skip decoding each file again
+    tasks_df['line_durs'] = tasks_df['number'].map(line_durs)
+    tasks_df['real_dur'] = tasks_df['number'].map(lambda number: sum(line_durs.get(number, [])))
 
-        max_workers = load_key("max_workers")
-        # parallel processing for remaining tasks
-        if len(tasks_df) > warmup_size:
-            remaining_tasks = tasks_df.iloc[warmup_size:].copy()
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                futures = [
-                    executor.submit(process_row, row, tasks_df.copy())
-                    for _, row in remaining_tasks.iterrows()
-                ]
-                
-                for future in as_completed(futures):
-                    try:
-                        number, real_dur = future.result()
-                        tasks_df.loc[tasks_df['number'] == number, 'real_dur'] = real_dur
-                        progress.advance(task)
-                    except Exception as e:
-                        rprint(f"[red]❌ Error: {str(e)}[/red]")
-                        raise e
+    # Learn this voice's speech rate for future duration estimates, from fresh speech only
+    used = record_tts_durations([(result.text, result.duration) for result in results if result.synthesized])
+    rprint(f"[cyan]📏 Recorded {used} line(s) for speech-rate calibration[/cyan]")
 
     rprint("[bold green]✨ TTS audio generation completed![/bold green]")
     return tasks_df
@@ -167,12 +147,12 @@ def merge_chunks(tasks_df: pd.DataFrame) -> pd.DataFrame:
                 new_sub_times = []
                 number = row['number']
                 lines = eval(row['lines']) if isinstance(row['lines'], str) else row['lines']
+                line_durs = row['line_durs'] if isinstance(row['line_durs'], list) else [None] * len(lines)
                 for line_index, line in enumerate(lines):
                     # 🔄 Step2: Start speed change and save as OUTPUT_FILE_TEMPLATE
                     temp_file = TEMP_FILE_TEMPLATE.format(f"{number}_{line_index}")
                     output_file = OUTPUT_FILE_TEMPLATE.format(f"{number}_{line_index}")
-                    adjust_audio_speed(temp_file, output_file, speed_factor)
-                    ad_dur = get_audio_duration(output_file)
+                    ad_dur = adjust_audio_speed(temp_file, output_file, speed_factor, line_durs[line_index])
                     new_sub_times.append([cur_time, cur_time+ad_dur])
                     cur_time += ad_dur
                 # 🔄 Step3: Find corresponding main DataFrame index and update new_sub_times
@@ -229,7 +209,7 @@ def gen_audio() -> None:
     tasks_df = merge_chunks(tasks_df)
     
     # 💾 Step5: Save results
-    tasks_df.to_excel(_8_1_AUDIO_TASK, index=False)
+    tasks_df.drop(columns=['line_durs']).to_excel(_8_1_AUDIO_TASK, index=False)
     rprint("[bold green]🎉 Audio generation completed successfully![/bold green]")
 
 if __name__ == "__main__":
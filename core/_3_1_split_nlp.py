@@ -1,4 +1,4 @@
-from core.light_split import simple_split_by_mark, simple_split_by_comma, simple_split_by_connectors, simple_split_long_sentences
+from core.light_split import simple_split_to_file
 from core.utils.models import _3_1_SPLIT_BY_NLP
 from core.utils import check_file_exists
 
@@ -6,10 +6,7 @@ from core.utils import check_file_exists
 @check_file_exists(_3_1_SPLIT_BY_NLP)
 def split_by_spacy():
     """Split sentences using lightweight rules (no spaCy)."""
-    simple_split_by_mark()
-    simple_split_by_comma()
-    simple_split_by_connectors()
-    simple_split_long_sentences()
+    simple_split_to_file()
     return
 
 
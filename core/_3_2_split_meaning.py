@@ -1,50 +1,77 @@
 import concurrent.futures
 from difflib import SequenceMatcher
 import math
-from core.prompts import get_split_prompt
+from core.prompts import get_split_prompt, get_split_batch_prompt
 from core.light_split import simple_tokenize
+from core.utils.job_context import get_job_context
 from core.utils import *
 from rich.console import Console
 from rich.table import Table
 from core.utils.models import _3_1_SPLIT_BY_NLP, _3_2_SPLIT_BY_MEANING
 console = Console()
 
-def tokenize_sentence(sentence, _=None):
+# Over-length sentences packed into one split request (1 disables batching)
+SPLIT_BATCH_SIZE = 5
+
+def tokenize_sentence(sentence, language=None):
     """Lightweight tokenizer (no spaCy)."""
-    return simple_tokenize(sentence)
+    return simple_tokenize(sentence, language)
 
 def find_split_positions(original, modified):
+    """Map the [br] marks of the LLM output back to character positions in the original sentence."""
     split_positions = []
     parts = modified.split('[br]')
-    start = 0
-    asr_language = load_key("asr.language")
-    language = load_key("asr.detected_language") if asr_language == 'auto' else asr_language
-    joiner = get_joiner(language)
 
+    # Align once, ignoring whitespace, and remember where each kept character sits in `original`
+    orig_index = [i for i, char in enumerate(original) if not char.isspace()]
+    orig_chars = ''.join(original[i] for i in orig_index)
+    part_chars = [''.join(part.split()) for part in parts]
+    opcodes = SequenceMatcher(None, orig_chars, ''.join(part_chars), autojunk=False).get_opcodes()
+
+    def to_original_count(modified_count):
+        """Number of original characters aligned to the first `modified_count` modified characters"""
+        for tag, i1, i2, j1, j2 in opcodes:
+            if j1 < modified_count <= j2:
+                if tag == 'equal':
+                    return i1 + modified_count - j1
+                return i1 + round((modified_count - j1) * (i2 - i1) / (j2 - j1))
+        return 0 if modified_count <= 0 else len(orig_chars)
+
+    modified_count = 0
+    prev_count = 0
     for i in range(len(parts) - 1):
-        max_similarity = 0
-        best_split = None
-
-        for j in range(start, len(original)):
-            original_left = original[start:j]
-            modified_left = joiner.join(parts[i].split())
-
-            left_similarity = SequenceMatcher(None, original_left, modified_left).ratio()
-
-            if left_similarity > max_similarity:
-                max_similarity = left_similarity
-                best_split = j
-
-        if max_similarity < 0.9:
-            console.print(f"[yellow]Warning: low similarity found at the best split point: {max_similarity}[/yellow]")
-        if best_split is not None:
-            split_positions.append(best_split)
-            start = best_split
-        else:
+        modified_count += len(part_chars[i])
+        orig_count = to_original_count(modified_count)
+        if orig_count <= prev_count or orig_count >= len(orig_chars):
             console.print(f"[yellow]Warning: Unable to find a suitable split point for the {i+1}th part.[/yellow]")
+            continue
+
+        similarity = SequenceMatcher(None, orig_chars[prev_count:orig_count], part_chars[i]).ratio()
+        if similarity < 0.9:
+            console.print(f"[yellow]Warning: low similarity found at the best split point: {similarity}[/yellow]")
+        # Split right after the last aligned character, like the original sentence would be cut
+        split_positions.append(orig_index[orig_count - 1] + 1)
+        prev_count = orig_count
 
     return split_positions
 
+def apply_split(sentence, llm_split, index=-1):
+    """Cut the original sentence at the [br] positions of the LLM output, return parts joined by newlines."""
+    split_points = find_split_positions(sentence, llm_split)
+    # split the sentence based on the split points
+    bounds = [0] + split_points + [len(sentence)]
+    best_split = '\n'.join(sentence[start:end] for start, end in zip(bounds[:-1], bounds[1:]))
+    if index != -1:
+        console.print(f'[green]✅ Sentence {index} has been successfully split[/green]')
+    table = Table(title="")
+    table.add_column("Type", style="cyan")
+    table.add_column("Sentence")
+    table.add_row("Original", sentence, style="yellow")
+    table.add_row("Split", best_split.replace('\n', ' ||'), style="yellow")
+    console.print(table)
+    
+    return best_split
+
 def split_sentence(sentence, num_parts, word_limit=20, index=-1, retry_attempt=0):
     """Split a long sentence using GPT and return the result as a string."""
     split_prompt = get_split_prompt(sentence, num_parts, word_limit)
@@ -58,52 +85,68 @@ def split_sentence(sentence, num_parts, word_limit=20, index=-1, retry_attempt=0
     
     response_data = ask_gpt(split_prompt + " " * retry_attempt, resp_type='json', valid_def=valid_split, log_title='split_by_meaning')
     choice = response_data["choice"]
-    best_split = response_data[f"split{choice}"]
-    split_points = find_split_positions(sentence, best_split)
-    # split the sentence based on the split points
-    for i, split_point in enumerate(split_points):
-        if i == 0:
-            best_split = sentence[:split_point] + '\n' + sentence[split_point:]
+    return apply_split(sentence, response_data[f"split{choice}"], index)
+
+def is_valid_batch_split(sentence, llm_split):
+    """Per-item check for batched answers: has [br] tags and keeps the original text"""
+    if not isinstance(llm_split, str) or '[br]' not in llm_split:
+        return False
+    original_chars = ''.join(sentence.split())
+    split_chars = ''.join(llm_split.replace('[br]', ' ').split())
+    return SequenceMatcher(None, original_chars, split_chars, autojunk=False).ratio() >= 0.9
+
+def split_sentences_batch(batch, word_limit=20, retry_attempt=0):
+    """Split several sentences with one GPT request, falling back to single requests for failed items.
+
+    batch: list of (index, sentence, num_parts); returns {index: split result string}
+    """
+    if len(batch) == 1:
+        index, sentence, num_parts = batch[0]
+        return {index: split_sentence(sentence, num_parts, word_limit, index=index, retry_attempt=retry_attempt)}
+
+    items = [(str(i), sentence, num_parts) for i, (_, sentence, num_parts) in enumerate(batch, 1)]
+    try:
+        response_data = ask_gpt(get_split_batch_prompt(items, word_limit) + " " * retry_attempt, resp_type='json', log_title='split_by_meaning_batch')
+    except Exception as e:
+        console.print(f"[yellow]⚠️ Batch split request failed ({e}), falling back to single requests[/yellow]")
+        response_data = {}
+    if not isinstance(response_data, dict):
+        console.print(f"[yellow]⚠️ Batch split answer is not an object, falling back to single requests[/yellow]")
+        response_data = {}
+
+    results = {}
+    for sentence_id, (index, sentence, num_parts) in zip([item[0] for item in items], batch):
+        item = response_data.get(sentence_id)
+        llm_split = item.get('split') if isinstance(item, dict) else item
+        if is_valid_batch_split(sentence, llm_split):
+            results[index] = apply_split(sentence, llm_split, index)
         else:
-            parts = best_split.split('\n')
-            last_part = parts[-1]
-            parts[-1] = last_part[:split_point - split_points[i-1]] + '\n' + last_part[split_point - split_points[i-1]:]
-            best_split = '\n'.join(parts)
-    if index != -1:
-        console.print(f'[green]✅ Sentence {index} has been successfully split[/green]')
-    table = Table(title="")
-    table.add_column("Type", style="cyan")
-    table.add_column("Sentence")
-    table.add_row("Original", sentence, style="yellow")
-    table.add_row("Split", best_split.replace('\n', ' ||'), style="yellow")
-    console.print(table)
-    
-    return best_split
+            console.print(f"[yellow]⚠️ Sentence {index} missing or invalid in batch answer, retrying alone[/yellow]")
+            results[index] = split_sentence(sentence, num_parts, word_limit, index=index, retry_attempt=retry_attempt)
+    return results
 
 def parallel_split_sentences(sentences, max_length, max_workers, _=None, retry_attempt=0):
-    """Split sentences in parallel using a thread pool."""
-    new_sentences = [None] * len(sentences)
-    futures = []
-
+    """Split sentences in parallel using a thread pool, packing up to SPLIT_BATCH_SIZE sentences per request."""
+    new_sentences = [[sentence] for sentence in sentences]
+    to_split = []
+    language = get_job_context().src_language
+    for index, sentence in enumerate(sentences):
+        # Use tokenizer to split the sentence
+        tokens = tokenize_sentence(sentence, language)
+        if len(tokens) > max_length:
+            to_split.append((index, sentence, math.ceil(len(tokens) / max_length)))
+
+    batches = [to_split[i:i + SPLIT_BATCH_SIZE] for i in range(0, len(to_split), SPLIT_BATCH_SIZE)]
     with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-        for index, sentence in enumerate(sentences):
-            # Use tokenizer to split the sentence
-            tokens = tokenize_sentence(sentence)
-            # print("Tokenization result:", tokens)
-            num_parts = math.ceil(len(tokens) / max_length)
-            if len(tokens) > max_length:
-                future = executor.submit(split_sentence, sentence, num_parts, max_length, index=index, retry_attempt=retry_attempt)
-                futures.append((future, index, num_parts, sentence))
-            else:
-                new_sentences[index] = [sentence]
-
-        for future, index, num_parts, sentence in futures:
-            split_result = future.result()
-            if split_result:
-                split_lines = split_result.strip().split('\n')
-                new_sentences[index] = [line.strip() for line in split_lines]
-            else:
-                new_sentences[index] = [sentence]
+        futures = []
+        for batch in batches:
+            futures.append(executor.submit(split_sentences_batch, batch, max_length, retry_attempt))
+
+        for future in futures:
+            for index, split_result in future.result().items():
+                if split_result:
+                    split_lines = split_result.strip().split('\n')
+                    new_sentences[index] = [line.strip() for line in split_lines]
 
     return [sentence for sublist in new_sentences for sentence in sublist]
 
@@ -115,8 +158,9 @@ def split_sentences_by_meaning():
         sentences = [line.strip() for line in f.readlines()]
 
     # 🔄 process sentences multiple times to ensure all are split
+    ctx = get_job_context()
     for retry_attempt in range(3):
-        sentences = parallel_split_sentences(sentences, max_length=load_key("max_split_length"), max_workers=load_key("max_workers"), retry_attempt=retry_attempt)
+        sentences = parallel_split_sentences(sentences, max_length=ctx.max_split_length, max_workers=ctx.max_workers, retry_attempt=retry_attempt)
 
     # 💾 save results
     with open(_3_2_SPLIT_BY_MEANING, 'w', encoding='utf-8') as f:
@@ -1,37 +1,135 @@
 import json
-from core.prompts import get_summary_prompt
+import os
+import re
+import concurrent.futures
+from core.prompts import get_summary_prompt, get_summary_reduce_prompt
 import pandas as pd
 from core.utils import *
+from core.utils.term_matcher import TermMatcher
 from core.utils.models import _3_2_SPLIT_BY_MEANING, _4_1_TERMINOLOGY
 
 CUSTOM_TERMS_PATH = 'custom_terms.xlsx'
+# Prompt instructions and JSON answer added to each window, in tokens
+SUMMARY_PROMPT_OVERHEAD_TOKENS = 800
+MAX_MERGED_TERMS = 50
+CJK_CHAR_PATTERN = re.compile(r'[\u3040-\u30ff\u4e00-\u9fff\uac00-\ud7af]')
 
-def combine_chunks():
-    """Combine the text chunks identified by whisper into a single long text"""
+# Terminology matcher cache, rebuilt only when terminology.json changes
+_TERM_CACHE = {'stamp': None, 'terms': [], 'matcher': None}
+
+def estimate_tokens(text):
+    """Rough token count: one token per CJK character, about four characters per token otherwise"""
+    cjk_count = len(CJK_CHAR_PATTERN.findall(text))
+    return cjk_count + (len(text) - cjk_count) // 4 + 1
+
+def split_summary_windows():
+    """Split the full transcript into windows of about `summary_length` characters, within the token budget"""
     with open(_3_2_SPLIT_BY_MEANING, 'r', encoding='utf-8') as file:
-        sentences = file.readlines()
-    cleaned_sentences = [line.strip() for line in sentences]
-    combined_text = ' '.join(cleaned_sentences)
-    return combined_text[:load_key('summary_length')]  #! Return only the first x characters
+        sentences = [line.strip() for line in file.readlines() if line.strip()]
+    window_size = load_key('summary_length')
+
+    windows = []
+    window = ''
+    for sentence in sentences:
+        if window and len(window) + len(sentence) + 1 > window_size:
+            windows.append(window)
+            window = ''
+        window = f'{window} {sentence}' if window else sentence
+    if window:
+        windows.append(window)
+
+    # Keep evenly spaced windows when the whole transcript exceeds the budget
+    token_budget = load_key('summary_token_budget')
+    costs = [estimate_tokens(w) + SUMMARY_PROMPT_OVERHEAD_TOKENS for w in windows]
+    if len(windows) > 1 and sum(costs) > token_budget:
+        keep = max(1, int(token_budget // (sum(costs) / len(windows))))
+        step = len(windows) / keep
+        windows = [windows[int(i * step)] for i in range(keep)]
+        rprint(f"[yellow]⚠️ Transcript exceeds summary token budget ({token_budget}), sampling {keep}/{len(costs)} windows[/yellow]")
+    return windows
+
+def get_term_matcher(case_sensitive=False, word_boundary=False):
+    """Load terminology once and return (terms, matcher), reloading only if the file changed"""
+    stat = os.stat(_4_1_TERMINOLOGY)
+    stamp = (stat.st_mtime_ns, stat.st_size, case_sensitive, word_boundary)
+    if _TERM_CACHE['stamp'] != stamp:
+        with open(_4_1_TERMINOLOGY, 'r', encoding='utf-8') as file:
+            terms = json.load(file)['terms']
+        _TERM_CACHE['terms'] = terms
+        _TERM_CACHE['matcher'] = TermMatcher([term['src'] for term in terms], case_sensitive=case_sensitive, word_boundary=word_boundary)
+        _TERM_CACHE['stamp'] = stamp
+    return _TERM_CACHE['terms'], _TERM_CACHE['matcher']
 
-def search_things_to_note_in_prompt(sentence):
+def search_things_to_note_in_prompt(sentence, case_sensitive=False, word_boundary=False):
     """Search for terms to note in the given sentence"""
-    with open(_4_1_TERMINOLOGY, 'r', encoding='utf-8') as file:
-        things_to_note = json.load(file)
-    things_to_note_list = [term['src'] for term in things_to_note['terms'] if term['src'].lower() in sentence.lower()]
-    if things_to_note_list:
+    terms, matcher = get_term_matcher(case_sensitive, word_boundary)
+    matched_ids = matcher.match_ids(sentence)
+    if matched_ids:
         prompt = '\n'.join(
-            f'{i+1}. "{term["src"]}": "{term["tgt"]}",'
-            f' meaning: {term["note"]}'
-            for i, term in enumerate(things_to_note['terms'])
-            if term['src'] in things_to_note_list
+            f'{i+1}. "{terms[i]["src"]}": "{terms[i]["tgt"]}",'
+            f' meaning: {terms[i]["note"]}'
+            for i in matched_ids
         )
         return prompt
     else:
         return None
 
+def valid_summary(response_data):
+    required_keys = {'src', 'tgt', 'note'}
+    if 'terms' not in response_data:
+        return {"status": "error", "message": "Invalid response format"}
+    for term in response_data['terms']:
+        if not all(key in term for key in required_keys):
+            return {"status": "error", "message": "Invalid response format"}
+    return {"status": "success", "message": "Summary completed"}
+
+def summarize_window(window, custom_terms_json):
+    """Map step: extract theme and terms from one transcript window"""
+    summary_prompt = get_summary_prompt(window, custom_terms_json)
+    return ask_gpt(summary_prompt, resp_type='json', valid_def=valid_summary, log_title='summary')
+
+def merge_terms(window_summaries, windows, custom_terms_json):
+    """Deduplicate extracted terms and rank them by how many windows produced them"""
+    custom_srcs = {term['src'].strip().lower() for term in custom_terms_json['terms']}
+    merged = {}
+    for summary in window_summaries:
+        seen = set()
+        for term in summary['terms']:
+            key = str(term['src']).strip().lower()
+            if not key or key in custom_srcs or key in seen:
+                continue
+            seen.add(key)
+            if key in merged:
+                merged[key]['freq'] += 1
+            else:
+                merged[key] = {'term': {k: term[k] for k in ('src', 'tgt', 'note')}, 'freq': 1}
+
+    # Break ties by how often each term occurs in the transcript
+    entries = list(merged.values())
+    matcher = TermMatcher([entry['term']['src'] for entry in entries])
+    occurrences = [0] * len(entries)
+    for window in windows:
+        for term_id, _, _ in matcher.find_all(window):
+            occurrences[term_id] += 1
+    ranked = sorted(range(len(entries)), key=lambda i: (-entries[i]['freq'], -occurrences[i]))
+    return [entries[i]['term'] for i in ranked[:MAX_MERGED_TERMS]]
+
+def reduce_themes(window_summaries):
+    """Reduce step: combine per-window themes into one video theme"""
+    themes = [summary.get('theme', '') for summary in window_summaries if summary.get('theme')]
+    if len(themes) <= 1:
+        return themes[0] if themes else ''
+
+    def valid_theme(response_data):
+        if 'theme' not in response_data:
+            return {"status": "error", "message": "Missing required key: `theme`"}
+        return {"status": "success", "message": "Theme completed"}
+
+    response = ask_gpt(get_summary_reduce_prompt(themes), resp_type='json', valid_def=valid_theme, log_title='summary_reduce')
+    return response['theme']
+
 def get_summary():
-    src_content = combine_chunks()
+    windows = split_summary_windows()
     custom_terms = pd.read_excel(CUSTOM_TERMS_PATH)
     custom_terms_json = {
         "terms": 
@@ -47,19 +145,17 @@ def get_summary():
     if len(custom_terms) > 0:
         rprint(f"📖 Custom Terms Loaded: {len(custom_terms)} terms")
         rprint("📝 Terms Content:", json.dumps(custom_terms_json, indent=2, ensure_ascii=False))
-    summary_prompt = get_summary_prompt(src_content, custom_terms_json)
-    rprint("📝 Summarizing and extracting terminology ...")
-    
-    def valid_summary(response_data):
-        required_keys = {'src', 'tgt', 'note'}
-        if 'terms' not in response_data:
-            return {"status": "error", "message": "Invalid response format"}
-        for term in response_data['terms']:
-            if not all(key in term for key in required_keys):
-                return {"status": "error", "message": "Invalid response format"}   
-        return {"status": "success", "message": "Summary completed"}
+    rprint(f"📝 Summarizing and extracting terminology from {len(windows)} window(s) ...")
 
-    summary = ask_gpt(summary_prompt, resp_type='json', valid_def=valid_summary, log_title='summary')
+    # Map: summarize windows concurrently, keeping their original order
+    with concurrent.futures.ThreadPoolExecutor(max_workers=load_key("max_workers")) as executor:
+        window_summaries = list(executor.map(lambda w: summarize_window(w, custom_terms_json), windows))
+
+    # Reduce: merge terms and themes
+    summary = {
+        'theme': reduce_themes(window_summaries),
+        'terms': merge_terms(window_summaries, windows, custom_terms_json)
+    }
     summary['terms'].extend(custom_terms_json['terms'])
     
     with open(_4_1_TERMINOLOGY, 'w', encoding='utf-8') as f:
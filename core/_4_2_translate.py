@@ -1,15 +1,18 @@
 import pandas as pd
 import json
+import os
+import hashlib
 import concurrent.futures
 from core.translate_lines import translate_lines
 from core._4_1_summarize import search_things_to_note_in_prompt
-from core.utils.text_utils import check_len_then_trim
+from core.utils.text_utils import check_len_then_trim_many
 from core.utils.subtitle_utils import align_timestamp
 from core.utils import *
 from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, TextColumn
 from difflib import SequenceMatcher
 from core.utils.models import *
+from core.utils.job_context import get_job_context
 from core.logger import get_logger
 
 console = Console()
@@ -49,6 +52,38 @@ def translate_chunk(chunk, chunks, theme_prompt, i):
     translation, english_result = translate_lines(chunk, previous_content_prompt, after_content_prompt, things_to_note_prompt, theme_prompt, i)
     return i, english_result, translation
 
+# 📒 Journal of finished chunks, so a failed run only retranslates what is missing
+def translation_settings():
+    """Settings that change a chunk's translation; entries journaled under others are stale"""
+    with open(_4_1_TERMINOLOGY, 'rb') as f:
+        terminology_hash = hashlib.sha1(f.read()).hexdigest()
+    return json.dumps([load_key("target_language"), load_key("reflect_translate"), load_key("reflect_mode"), terminology_hash])
+
+def chunk_hash(chunk, settings):
+    return hashlib.sha1(f"{settings}\n{chunk}".encode('utf-8')).hexdigest()
+
+def load_translation_journal(chunks, settings):
+    """Load journaled results whose chunk text and settings still match, keyed by chunk index"""
+    journal = {}
+    if not os.path.exists(_4_2_TRANSLATION_JOURNAL):
+        return journal
+    with open(_4_2_TRANSLATION_JOURNAL, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # partially written line from an interrupted run
+            i = entry.get('index')
+            if isinstance(i, int) and 0 <= i < len(chunks) and entry.get('hash') == chunk_hash(chunks[i], settings):
+                journal[i] = (i, entry['source'], entry['translation'])
+    return journal
+
+def append_translation_journal(journal_file, chunk, settings, result):
+    i, english_result, translation = result
+    entry = {'index': i, 'hash': chunk_hash(chunk, settings), 'source': english_result, 'translation': translation}
+    journal_file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+    journal_file.flush()
+
 # Add similarity calculation function
 def similar(a, b):
     return SequenceMatcher(None, a, b).ratio()
@@ -61,20 +96,42 @@ def translate_all():
     with open(_4_1_TERMINOLOGY, 'r', encoding='utf-8') as file:
         theme_prompt = json.load(file).get('theme')
 
+    # 📒 Resume from journaled chunks of a previous run
+    # (target language, reflection mode and terminology are part of each entry's hash)
+    settings = translation_settings()
+    journal = load_translation_journal(chunks, settings)
+    if journal:
+        logger.info(f"Resuming translation: {len(journal)}/{len(chunks)} chunks loaded from journal")
+    results = list(journal.values())
+
     # 🔄 Use concurrent execution for translation
     with Progress(SpinnerColumn(), TextColumn("[progress.description]{task.description}"), transient=True) as progress:
-        task = progress.add_task("[cyan]Translating chunks...", total=len(chunks))
-        with concurrent.futures.ThreadPoolExecutor(max_workers=load_key("max_workers")) as executor:
-            futures = []
+        task = progress.add_task("[cyan]Translating chunks...", total=len(chunks), completed=len(journal))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=get_job_context().max_workers) as executor, \
+                open(_4_2_TRANSLATION_JOURNAL, 'a', encoding='utf-8') as journal_file:
+            futures = {}
             for i, chunk in enumerate(chunks):
+                if i in journal:
+                    continue
                 future = executor.submit(translate_chunk, chunk, chunks, theme_prompt, i)
-                futures.append(future)
-            results = []
+                futures[future] = i
+            failed = []
             for future in concurrent.futures.as_completed(futures):
-                results.append(future.result())
+                # Keep journaling the other chunks when one fails, so a rerun only retries the failures
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.error(f"Chunk {futures[future]} translation failed: {e}")
+                    failed.append(e)
+                    continue
+                append_translation_journal(journal_file, chunks[futures[future]], settings, result)
+                results.append(result)
                 progress.update(task, advance=1)
+    if failed:
+        raise failed[0]
 
     results.sort(key=lambda x: x[0])  # Sort results based on original order
+    results_by_index = {r[0]: r for r in results}
 
     # 💾 Save results to lists and Excel file
     src_text, trans_text = [], []
@@ -82,20 +139,24 @@ def translate_all():
         chunk_lines = chunk.split('\n')
         src_text.extend(chunk_lines)
 
-        # Calculate similarity between current chunk and translation results
+        # Results are index-tagged; only check that the echoed source is the same chunk
         chunk_text = ''.join(chunk_lines).lower()
-        matching_results = [(r, similar(''.join(r[1].split('\n')).lower(), chunk_text))
-                          for r in results]
-        best_match = max(matching_results, key=lambda x: x[1])
-
-        # Check similarity and handle exceptions
-        if best_match[1] < 0.9:
-            logger.warning(f"No matching translation found for chunk {i}")
-            raise ValueError(f"Translation matching failed (chunk {i})")
-        elif best_match[1] < 1.0:
-            logger.warning(f"Similar match found (chunk {i}, similarity: {best_match[1]:.3f})")
-
-        trans_text.extend(best_match[0][2].split('\n'))
+        result = results_by_index.get(i)
+        if result is None or ''.join(result[1].split('\n')).lower() != chunk_text:
+            # Fall back to similarity search only on mismatch
+            matching_results = [(r, similar(''.join(r[1].split('\n')).lower(), chunk_text))
+                              for r in results]
+            best_match = max(matching_results, key=lambda x: x[1])
+
+            # Check similarity and handle exceptions
+            if best_match[1] < 0.9:
+                logger.warning(f"No matching translation found for chunk {i}")
+                raise ValueError(f"Translation matching failed (chunk {i})")
+            elif best_match[1] < 1.0:
+                logger.warning(f"Similar match found (chunk {i}, similarity: {best_match[1]:.3f})")
+            result = best_match[0]
+
+        trans_text.extend(result[2].split('\n'))
 
     # Trim long translation text
     df_text = pd.read_excel(_2_CLEANED_CHUNKS)
@@ -104,11 +165,16 @@ def translate_all():
     subtitle_output_configs = [('trans_subs_for_audio.srt', ['Translation'])]
     df_time = align_timestamp(df_text, df_translate, subtitle_output_configs, output_dir=None, for_display=False)
     console.print(df_time)
-    # apply check_len_then_trim to df_time['Translation'], only when duration > MIN_TRIM_DURATION.
-    df_time['Translation'] = df_time.apply(lambda x: check_len_then_trim(x['Translation'], x['duration']) if x['duration'] > load_key("min_trim_duration") else x['Translation'], axis=1)
+    # Shorten translations that cannot be read in time, only when duration > MIN_TRIM_DURATION.
+    ctx = get_job_context()
+    to_trim = df_time['duration'] > ctx.min_trim_duration
+    df_time.loc[to_trim, 'Translation'] = check_len_then_trim_many(
+        df_time.loc[to_trim, 'Translation'], df_time.loc[to_trim, 'duration'], max_workers=ctx.max_workers)
     console.print(df_time)
 
     df_time.to_excel(_4_2_TRANSLATION, index=False)
+    if os.path.exists(_4_2_TRANSLATION_JOURNAL):
+        os.remove(_4_2_TRANSLATION_JOURNAL)
     logger.success("✅ Translation completed and results saved.")
 
 if __name__ == '__main__':
@@ -1,33 +1,62 @@
+import re
 import pandas as pd
+import numpy as np
 import concurrent.futures
 
-from core._3_2_split_meaning import split_sentence
-from core.prompts import get_align_prompt
+from core._3_2_split_meaning import split_sentence, apply_split, is_valid_batch_split
+from core.prompts import get_align_prompt, get_split_align_prompt
 from rich.panel import Panel
 from rich.console import Console
 from rich.table import Table
 from core.utils import *
 from core.utils.models import *
+from core.utils.job_context import get_job_context
+from core.utils.subtitle_utils import WordIndex, remove_punctuation
 console = Console()
 
+# Split rounds: lines still too long after a round are carried into the next one
+MAX_SPLIT_ROUNDS = 3
+
+# Local splitter: punctuation shared by both languages, scored by position and pauses
+STRONG_SPLIT_PUNCT = set('.!?;。！？；')
+WEAK_SPLIT_PUNCT = set(',:，：、')
+FULLWIDTH_SPLIT_PUNCT = set('。！？；，：、')
+LOCAL_SPLIT_MIN_CONFIDENCE = 0.7
+LOCAL_SPLIT_MAX_RATIO_DIFF = 0.25  # source/target length ratio gap scoring zero
+LOCAL_SPLIT_FULL_PAUSE = 0.5  # seconds of silence that count as a certain break
+LOCAL_SPLIT_MIN_CHARS = 3
+
 # ! You can modify your own weights here
 # Chinese and Japanese 2.5 characters, Korean 2 characters, Thai 1.5 characters, full-width symbols 2 characters, other English-based and half-width symbols 1 character
+# (weight, codepoint ranges); every other character (incl. Thai, English and half-width symbols) weighs 1
+CHAR_WEIGHT_CLASSES = [
+    (1.75, [(0x4E00, 0x9FFF), (0x3040, 0x30FF), (0xFF01, 0xFF5E)]),  # Chinese, Japanese and full-width symbols
+    (1.5, [(0xAC00, 0xD7A3), (0x1100, 0x11FF)]),  # Korean
+]
+# One character-class pattern per weight class; matches are counted in C
+_WEIGHT_PATTERNS = [
+    (weight - 1, re.compile('[' + ''.join(f'{re.escape(chr(lo))}-{re.escape(chr(hi))}' for lo, hi in ranges) + ']'))
+    for weight, ranges in CHAR_WEIGHT_CLASSES
+]
+
 def calc_len(text: str) -> float:
     text = str(text) # force convert
-    def char_weight(char):
-        code = ord(char)
-        if 0x4E00 <= code <= 0x9FFF or 0x3040 <= code <= 0x30FF:  # Chinese and Japanese
-            return 1.75
-        elif 0xAC00 <= code <= 0xD7A3 or 0x1100 <= code <= 0x11FF:  # Korean
-            return 1.5
-        elif 0x0E00 <= code <= 0x0E7F:  # Thai
-            return 1
-        elif 0xFF01 <= code <= 0xFF5E:  # full-width symbols
-            return 1.75
-        else:  # other characters (e.g. English and half-width symbols)
-            return 1
-
-    return sum(char_weight(char) for char in text)
+    return len(text) + sum(extra * len(pattern.findall(text)) for extra, pattern in _WEIGHT_PATTERNS)
+
+def calc_len_many(texts) -> np.ndarray:
+    """Weighted lengths of many lines at once, from one UTF-32 view of all their codepoints"""
+    texts = [str(text) for text in texts]
+    codes = np.frombuffer(''.join(texts).encode('utf-32-le'), dtype=np.uint32)
+    weights = np.ones(len(codes))
+    for weight, ranges in CHAR_WEIGHT_CLASSES:
+        mask = np.zeros(len(codes), dtype=bool)
+        for lo, hi in ranges:
+            mask |= (codes >= lo) & (codes <= hi)
+        weights[mask] = weight
+    # Per-line sums as differences of the running total at line boundaries
+    totals = np.concatenate(([0.0], np.cumsum(weights)))
+    bounds = np.concatenate(([0], np.cumsum([len(text) for text in texts], dtype=np.int64)))
+    return totals[bounds[1:]] - totals[bounds[:-1]]
 
 def align_subs(src_sub: str, tr_sub: str, src_part: str) -> tuple[list[str], list[str], str]:
     align_prompt = get_align_prompt(src_sub, tr_sub, src_part)
@@ -43,10 +72,7 @@ def align_subs(src_sub: str, tr_sub: str, src_part: str) -> tuple[list[str], lis
     src_parts = src_part.split('\n')
     tr_parts = [item[f'target_part_{i+1}'].strip() for i, item in enumerate(align_data)]
     
-    asr_language = load_key("asr.language")
-    language = load_key("asr.detected_language") if asr_language == 'auto' else asr_language
-    joiner = get_joiner(language)
-    tr_remerged = joiner.join(tr_parts)
+    tr_remerged = get_job_context().require_joiner().join(tr_parts)
     
     table = Table(title="🔗 Aligned parts")
     table.add_column("Language", style="cyan")
@@ -57,39 +83,215 @@ def align_subs(src_sub: str, tr_sub: str, src_part: str) -> tuple[list[str], lis
     
     return src_parts, tr_parts, tr_remerged
 
-def split_align_subs(src_lines: list[str], tr_lines: list[str]):
-    MAX_SUB_LENGTH = load_key("subtitle.max_length")
-    TARGET_SUB_MULTIPLIER = load_key("subtitle.target_multiplier")
-    remerged_tr_lines = tr_lines.copy()
-    
-    to_split = []
-    for i, (src, tr) in enumerate(zip(src_lines, tr_lines)):
-        src, tr = str(src), str(tr)
-        if len(src) > MAX_SUB_LENGTH or calc_len(tr) * TARGET_SUB_MULTIPLIER > MAX_SUB_LENGTH:
-            to_split.append(i)
-            table = Table(title=f"📏 Line {i} needs to be split")
-            table.add_column("Type", style="cyan")
-            table.add_column("Content", style="magenta")
-            table.add_row("Source Line", src)
-            table.add_row("Target Line", tr)
-            console.print(table)
-    
-    @except_handler("Error in split_align_subs")
-    def process(i):
-        split_src = split_sentence(src_lines[i], num_parts=2).strip()
-        src_parts, tr_parts, tr_remerged = align_subs(src_lines[i], tr_lines[i], split_src)
-        src_lines[i] = src_parts
-        tr_lines[i] = tr_parts
-        remerged_tr_lines[i] = tr_remerged
-    
-    with concurrent.futures.ThreadPoolExecutor(max_workers=load_key("max_workers")) as executor:
-        executor.map(process, to_split)
-    
-    # Flatten `src_lines` and `tr_lines`
-    src_lines = [item for sublist in src_lines for item in (sublist if isinstance(sublist, list) else [sublist])]
-    tr_lines = [item for sublist in tr_lines for item in (sublist if isinstance(sublist, list) else [sublist])]
-    
-    return src_lines, tr_lines, remerged_tr_lines
+class WordPauses:
+    """Silence (in seconds) after any point of a source line, from the ASR word timings"""
+
+    def __init__(self, df_words, src_lines):
+        self.index = WordIndex(df_words['text'])
+        self.starts = df_words['start'].to_numpy(dtype=float)
+        self.ends = df_words['end'].to_numpy(dtype=float)
+        self.lines = [str(src) for src in src_lines]
+        # Offset of every source line in the normalized transcript (None if not found verbatim)
+        self.line_begin = []
+        cursor = 0
+        for src in self.lines:
+            span = self.index.find(self._normalize(src), cursor)
+            self.line_begin.append(span[0] if span else None)
+            if span:
+                cursor = span[1]
+
+    @staticmethod
+    def _normalize(text):
+        return remove_punctuation(text.lower()).replace(" ", "")
+
+    def pause_after(self, line_idx, piece, pos):
+        """Gap between the word ending at `piece[:pos]` and the next word, or None if unknown"""
+        begin = self.line_begin[line_idx]
+        offset = self.lines[line_idx].find(piece)
+        if begin is None or offset == -1:
+            return None
+        count = len(self._normalize(self.lines[line_idx][:offset] + piece[:pos]))
+        if count == 0:
+            return None
+        word = self.index.word_at(begin + count - 1)
+        if word + 1 >= len(self.starts):
+            return None
+        return max(0.0, float(self.starts[word + 1] - self.ends[word]))
+
+def punct_split_points(text):
+    """(position, strength) after each splitting punctuation mark that is followed by more text"""
+    points = []
+    for pos, char in enumerate(text[:-1]):
+        if char not in STRONG_SPLIT_PUNCT and char not in WEAK_SPLIT_PUNCT:
+            continue
+        nxt = text[pos + 1]
+        if nxt in STRONG_SPLIT_PUNCT or nxt in WEAK_SPLIT_PUNCT:
+            continue  # split after the whole punctuation run
+        if char not in FULLWIDTH_SPLIT_PUNCT and not nxt.isspace():
+            continue  # e.g. "3.5" or "U.S."
+        points.append((pos + 1, 1.0 if char in STRONG_SPLIT_PUNCT else 0.7))
+    return points
+
+def local_split(src, tr, pause_after=None):
+    """
+    Propose one aligned split of a source/translation pair at punctuation.
+
+    Each pair of source and target split points is scored by how well their
+    length ratios agree, how balanced the parts are, punctuation strength and,
+    when word timings are known, the pause in the audio. Returns
+    (src_parts, tr_parts, confidence) for the best pair, or None.
+    """
+    src_len, tr_len = calc_len(src), calc_len(tr)
+    if not src_len or not tr_len:
+        return None
+    best = None
+    for s_pos, s_strength in punct_split_points(src):
+        s_left, s_right = src[:s_pos].strip(), src[s_pos:].strip()
+        if len(s_left) < LOCAL_SPLIT_MIN_CHARS or len(s_right) < LOCAL_SPLIT_MIN_CHARS:
+            continue
+        s_ratio = calc_len(src[:s_pos]) / src_len
+        pause = pause_after(s_pos) if pause_after else None
+        for t_pos, t_strength in punct_split_points(tr):
+            t_left, t_right = tr[:t_pos].strip(), tr[t_pos:].strip()
+            if not t_left or not t_right:
+                continue
+            t_ratio = calc_len(tr[:t_pos]) / tr_len
+            ratio_score = 1 - min(1.0, abs(s_ratio - t_ratio) / LOCAL_SPLIT_MAX_RATIO_DIFF)
+            balance_score = 1 - min(1.0, abs(s_ratio - 0.5) / 0.4)
+            punct_score = (s_strength + t_strength) / 2
+            if pause is None:
+                confidence = 0.5 * ratio_score + 0.25 * balance_score + 0.25 * punct_score
+            else:
+                pause_score = min(1.0, pause / LOCAL_SPLIT_FULL_PAUSE)
+                confidence = 0.4 * ratio_score + 0.2 * balance_score + 0.2 * punct_score + 0.2 * pause_score
+            if best is None or confidence > best[2]:
+                best = ([s_left, s_right], [t_left, t_right], confidence)
+    return best
+
+def needs_split_many(src_lines, tr_lines, max_length, multiplier) -> np.ndarray:
+    """Boolean mask of the source/translation pairs that exceed the subtitle length limit"""
+    src_lengths = np.fromiter((len(str(src)) for src in src_lines), dtype=float, count=len(src_lines))
+    return (src_lengths > max_length) | (calc_len_many(tr_lines) * multiplier > max_length)
+
+def split_align_sub(src_sub: str, tr_sub: str) -> tuple[list[str], list[str]]:
+    """Split a source line and align its translation with a single LLM request"""
+    def valid_split_align(response_data):
+        align_data = response_data.get('align')
+        if not isinstance(align_data, list) or len(align_data) < 2:
+            return {"status": "error", "message": "Align does not contain more than 1 part as expected!"}
+        for i, item in enumerate(align_data):
+            if not str(item.get(f'src_part_{i+1}', '')).strip() or not str(item.get(f'target_part_{i+1}', '')).strip():
+                return {"status": "error", "message": f"Missing or empty part {i+1}"}
+        src_split = '[br]'.join(item[f'src_part_{i+1}'] for i, item in enumerate(align_data))
+        if not is_valid_batch_split(src_sub, src_split):
+            return {"status": "error", "message": "Source parts do not match the original subtitle"}
+        return {"status": "success", "message": "Split and align completed"}
+
+    parsed = ask_gpt(get_split_align_prompt(src_sub, tr_sub), resp_type='json', valid_def=valid_split_align, log_title='split_align_subs')
+    align_data = parsed['align']
+    # Cut the original text at the LLM's split points so the source is never rewritten
+    src_split = '[br]'.join(item[f'src_part_{i+1}'] for i, item in enumerate(align_data))
+    src_parts = [part.strip() for part in apply_split(src_sub, src_split).split('\n')]
+    tr_parts = [item[f'target_part_{i+1}'].strip() for i, item in enumerate(align_data)]
+    return src_parts, tr_parts
+
+def split_align_subs(src_lines: list[str], tr_lines: list[str], pauses: WordPauses = None):
+    """
+    Split over-length subtitle lines until they fit, carrying only unresolved parts between rounds.
+
+    Each part is first offered to the local punctuation splitter; only proposals below
+    LOCAL_SPLIT_MIN_CONFIDENCE are sent to the LLM.
+
+    Returns the flattened source and translation parts, plus one remerged translation per input line.
+    """
+    ctx = get_job_context()
+    MAX_SUB_LENGTH = ctx.subtitle_max_length
+    TARGET_SUB_MULTIPLIER = ctx.subtitle_target_multiplier
+    joiner = ctx.require_joiner()
+
+    # pieces[i] holds the (source, translation) parts of input line i
+    pieces = [[(str(src), str(tr))] for src, tr in zip(src_lines, tr_lines)]
+    too_long = needs_split_many(src_lines, tr_lines, MAX_SUB_LENGTH, TARGET_SUB_MULTIPLIER)
+    worklist = [(int(i), 0) for i in np.flatnonzero(too_long)]
+    for i, _ in worklist:
+        table = Table(title=f"📏 Line {i} needs to be split")
+        table.add_column("Type", style="cyan")
+        table.add_column("Content", style="magenta")
+        table.add_row("Source Line", str(src_lines[i]))
+        table.add_row("Target Line", str(tr_lines[i]))
+        console.print(table)
+
+    def process(item):
+        """Return (src_parts, tr_parts, llm_calls); parts are None when the line could not be split"""
+        i, k = item
+        src, tr = pieces[i][k]
+        try:
+            src_parts, tr_parts = split_align_sub(src, tr)
+            if len(src_parts) == len(tr_parts):
+                return src_parts, tr_parts, 1
+            console.print(f"[yellow]⚠️ Line {i}: split and align disagree on part count, splitting in two steps[/yellow]")
+            split_src = split_sentence(src, num_parts=2).strip()
+            src_parts, tr_parts, _ = align_subs(src, tr, split_src)
+            return src_parts, tr_parts, 3
+        except Exception as e:
+            console.print(f"[red]❌ Error in split_align_subs for line {i}: {e}[/red]")
+            return None, None, 1
+
+    def try_local(item):
+        i, k = item
+        src, tr = pieces[i][k]
+        pause_after = (lambda pos: pauses.pause_after(i, src, pos)) if pauses else None
+        proposal = local_split(src, tr, pause_after)
+        if proposal is None or proposal[2] < LOCAL_SPLIT_MIN_CONFIDENCE:
+            return None
+        return proposal[0], proposal[1], 0
+
+    stats = Table(title="🔁 Subtitle split rounds")
+    for column in ("Round", "Submitted", "Local", "LLM calls", "Split", "Remaining"):
+        stats.add_column(column)
+
+    for round_idx in range(MAX_SPLIT_ROUNDS):
+        if not worklist:
+            break
+        console.print(Panel(f"🔄 Split round {round_idx + 1}: {len(worklist)} line(s) to split", expand=False))
+        results = {}
+        for item in worklist:
+            local = try_local(item)
+            if local is not None:
+                results[item] = local
+        local_count = len(results)
+        llm_items = [item for item in worklist if item not in results]
+        with concurrent.futures.ThreadPoolExecutor(max_workers=ctx.max_workers) as executor:
+            results.update(zip(llm_items, executor.map(process, llm_items)))
+
+        # Replace split pieces (back to front keeps earlier indices valid) and queue parts still too long
+        next_worklist, calls, split_count = [], 0, 0
+        for i, k in sorted(worklist, reverse=True):
+            src_parts, tr_parts, n_calls = results[(i, k)]
+            calls += n_calls
+            if src_parts is None:
+                next_worklist.append((i, k))
+                continue
+            split_count += 1
+            pieces[i][k:k+1] = list(zip(src_parts, tr_parts))
+            # Shift queued pieces of the same line that sit after the replaced one
+            shift = len(src_parts) - 1
+            next_worklist = [(j, m + shift) if j == i and m > k else (j, m) for j, m in next_worklist]
+            too_long = needs_split_many(src_parts, tr_parts, MAX_SUB_LENGTH, TARGET_SUB_MULTIPLIER)
+            next_worklist += [(i, k + int(n)) for n in np.flatnonzero(too_long)]
+        worklist = sorted(next_worklist)
+        stats.add_row(str(round_idx + 1), str(len(results)), str(local_count), str(calls), str(split_count), str(len(worklist)))
+        console.print(f"[cyan]📊 Round {round_idx + 1}: {len(results)} submitted, {local_count} split locally, {calls} LLM call(s), {split_count} split, {len(worklist)} remaining[/cyan]")
+
+    console.print(stats)
+    if worklist:
+        console.print(f"[yellow]⚠️ {len(worklist)} subtitle part(s) are still too long after {MAX_SPLIT_ROUNDS} rounds[/yellow]")
+
+    split_src = [src for line in pieces for src, _ in line]
+    split_tr = [tr for line in pieces for _, tr in line]
+    remerged_tr_lines = [tr_lines[i] if len(line) == 1 else joiner.join(tr for _, tr in line)
+                         for i, line in enumerate(pieces)]
+    return split_src, split_tr, remerged_tr_lines
 
 def split_for_sub_main():
     console.print("[bold green]🚀 Start splitting subtitles...[/bold green]")
@@ -97,29 +299,16 @@ def split_for_sub_main():
     df = pd.read_excel(_4_2_TRANSLATION)
     src = df['Source'].tolist()
     trans = df['Translation'].tolist()
-    
-    MAX_SUB_LENGTH = load_key("subtitle.max_length")
-    TARGET_SUB_MULTIPLIER = load_key("subtitle.target_multiplier")
-
-    for attempt in range(3):  # 多次切割
-        console.print(Panel(f"🔄 Split attempt {attempt + 1}", expand=False))
-        split_src, split_trans, remerged = split_align_subs(src.copy(), trans)
-        
-        # 检查是否所有字幕都符合长度要求
-        if all(len(src) <= MAX_SUB_LENGTH for src in split_src) and \
-           all(calc_len(tr) * TARGET_SUB_MULTIPLIER <= MAX_SUB_LENGTH for tr in split_trans):
-            break
-        
-        # 更新源数据继续下一轮分割
-        src, trans = split_src, split_trans
-
-    # 确保二者有相同的长度，防止报错
-    if len(src) > len(remerged):
-        remerged += [None] * (len(src) - len(remerged))
-    elif len(remerged) > len(src):
-        src += [None] * (len(remerged) - len(src))
-    
+
+    # ASR word timings let the local splitter prefer points where the speaker pauses
+    df_text = pd.read_excel(_2_CLEANED_CHUNKS)
+    df_text['text'] = df_text['text'].str.strip('"').str.strip()
+    pauses = WordPauses(df_text, src)
+
+    split_src, split_trans, remerged = split_align_subs(src, trans, pauses)
+
     pd.DataFrame({'Source': split_src, 'Translation': split_trans}).to_excel(_5_SPLIT_SUB, index=False)
+    # Remerged translations stay one per original line, so dubbing lines up with the unsplit source
     pd.DataFrame({'Source': src, 'Translation': remerged}).to_excel(_5_REMERGED, index=False)
 
 if __name__ == '__main__':
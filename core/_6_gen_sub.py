@@ -13,7 +13,10 @@ SUBTITLE_OUTPUT_CONFIGS = [
     ('src.srt', ['Source']),
     ('trans.srt', ['Translation']),
     ('src_trans.srt', ['Source', 'Translation']),
-    ('trans_src.srt', ['Translation', 'Source'])
+    ('trans_src.srt', ['Translation', 'Source']),
+    ('src_trans.vtt', ['Source', 'Translation']),
+    ('src_trans.ass', ['Source', 'Translation']),  # burned into the video by _7_sub_into_vid
+    ('subtitles.json', ['Source', 'Translation'])
 ]
 
 AUDIO_SUBTITLE_OUTPUT_CONFIGS = [
@@ -22,6 +22,8 @@ OUTPUT_DIR = "output"
 OUTPUT_VIDEO = f"{OUTPUT_DIR}/output_sub.mp4"
 SRC_SRT = f"{OUTPUT_DIR}/src.srt"
 TRANS_SRT = f"{OUTPUT_DIR}/trans.srt"
+# Bilingual, pre-styled subtitles written by _6_gen_sub; burned in a single libass pass
+SUB_ASS = f"{OUTPUT_DIR}/src_trans.ass"
 
 SRC_FONT_SIZE = 15
 TRANS_FONT_SIZE = 17
@@ -45,7 +47,8 @@ def merge_subtitles_to_video():
         rprint("[bold green]Placeholder video has been generated.[/bold green]")
         return
 
-    if not os.path.exists(SRC_SRT) or not os.path.exists(TRANS_SRT):
+    use_ass = os.path.exists(SUB_ASS)
+    if not use_ass and (not os.path.exists(SRC_SRT) or not os.path.exists(TRANS_SRT)):
         rprint("Subtitle files not found in the 'output' directory.")
         exit(1)
 
@@ -62,15 +65,16 @@ def merge_subtitles_to_video():
     height = int(video_info['height'])
     rprint(f"[bold green]Video resolution: {width}x{height}[/bold green]")
 
-    # Build filter chain: scale + src_subtitle + trans_subtitle
-    # FFmpeg subtitles filter with force_style
+    # Build filter chain: scale + pad + subtitles
+    scale_pad = (
+        f"scale={width}:{height}:force_original_aspect_ratio=decrease,"
+        f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2"
+    )
+    # Fallback: two SRT files with force_style, each parsed and rendered by its own filter
     src_style = f"FontSize={SRC_FONT_SIZE},PrimaryColour=&HFFFFFF,OutlineColour=&H000000"
     trans_style = f"FontSize={TRANS_FONT_SIZE},PrimaryColour=&H00FFFF,OutlineColour=&H000000"
-
-    # Chain subtitles filters using filter_complex
-    filter_str = (
-        f"scale={width}:{height}:force_original_aspect_ratio=decrease,"
-        f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,"
+    srt_filter_str = (
+        f"{scale_pad},"
         f"subtitles={SRC_SRT}:force_style='{src_style}',"
         f"subtitles={TRANS_SRT}:force_style='{trans_style}'"
     )
@@ -92,16 +96,28 @@ def merge_subtitles_to_video():
         rprint("[bold green]Using CPU for encoding...[/bold green]")
         encoder = 'libx264'
 
-    stream = ffmpeg.input(video_file)
-    stream = ffmpeg.output(
-        stream,
-        OUTPUT_VIDEO,
-        vf=filter_str,
-        vcodec=encoder,
-        acodec='aac',
-        y=None
-    )
-    ffmpeg.run(stream, overwrite_output=True, quiet=True)
+    def burn(filter_str):
+        stream = ffmpeg.input(video_file)
+        stream = ffmpeg.output(
+            stream,
+            OUTPUT_VIDEO,
+            vf=filter_str,
+            vcodec=encoder,
+            acodec='aac',
+            y=None
+        )
+        ffmpeg.run(stream, overwrite_output=True, quiet=True)
+
+    if use_ass:
+        try:
+            burn(f"{scale_pad},ass={SUB_ASS}")
+        except ffmpeg.Error as e:
+            if not os.path.exists(SRC_SRT) or not os.path.exists(TRANS_SRT):
+                raise
+            show_warning(f"⚠️ Burning ASS subtitles failed, falling back to SRT: {e}")
+            burn(srt_filter_str)
+    else:
+        burn(srt_filter_str)
 
     rprint(f"\n✅ Done! Time taken: {time.time() - start_time:.2f} seconds")
 
@@ -3,14 +3,14 @@ import re
 import pandas as pd
 from core._8_1_audio_task import time_diff_seconds
 from core.asr_backend.audio_preprocess import get_audio_duration
-from core.tts_backend.estimate_duration import init_estimator, estimate_duration
+from core.tts_backend.estimate_duration import get_estimator
+from core.tts_backend.calibration import get_speech_rates
 from core.utils import *
 from core.utils.models import *
 
 SRC_SRT = "output/src.srt"
 TRANS_SRT = "output/trans.srt"
 MAX_MERGE_COUNT = 5
-ESTIMATOR = None
 
 def calc_if_too_fast(est_dur, tol_dur, duration, tolerance):
     accept = load_key("speed_factor.accept") # Maximum acceptable speed factor
@@ -57,9 +57,6 @@ def merge_rows(df, start_idx, merge_count):
 
 def analyze_subtitle_timing_and_speed(df):
     rprint("[🔍 Analyzing] Calculating subtitle timing and speed...")
-    global ESTIMATOR
-    if ESTIMATOR is None:
-        ESTIMATOR = init_estimator()
     TOLERANCE = load_key("tolerance")
     whole_dur = get_audio_duration(_RAW_AUDIO_FILE)
     df['gap'] = 0.0  # Initialize gap column
@@ -76,7 +73,7 @@ def analyze_subtitle_timing_and_speed(df):
     
     df['tolerance'] = df['gap'].apply(lambda x: TOLERANCE if x > TOLERANCE else x)
     df['tol_dur'] = df['duration'] + df['tolerance']
-    df['est_dur'] = df.apply(lambda x: estimate_duration(x['text'], ESTIMATOR), axis=1)
+    df['est_dur'] = get_estimator().estimate_many(df['text'], get_speech_rates())
 
     ## Calculate speed indicators
     accept = load_key("speed_factor.accept") # Maximum acceptable speed factor
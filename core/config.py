@@ -1,6 +1,6 @@
 from dataclasses import dataclass, field
 from typing import List, Optional
-from core.utils.config_utils import load_key, update_key
+from core.utils.config_utils import load_key, update_key, get_config_snapshot
 from core.constants import (
     DEFAULT_DISPLAY_LANGUAGE,
     DEFAULT_API_KEY,
@@ -10,7 +10,9 @@ from core.constants import (
     DEFAULT_API_LLM_SUPPORT_JSON,
     DEFAULT_MAX_WORKERS,
     DEFAULT_SUMMARY_LENGTH,
+    DEFAULT_SUMMARY_TOKEN_BUDGET,
     DEFAULT_REFLECT_TRANSLATE,
+    DEFAULT_REFLECT_MODE,
     DEFAULT_PAUSE_BEFORE_TRANSLATE,
     DEFAULT_ASR_LANGUAGE,
     DEFAULT_ASR_DETECTED_LANGUAGE,
@@ -43,6 +45,7 @@ from core.constants import (
     ALLOWED_AUDIO_FORMATS,
     LANGUAGE_SPLIT_WITH_SPACE,
     LANGUAGE_SPLIT_WITHOUT_SPACE,
+    REFLECT_MODE_OPTIONS,
 )
 import threading
 
@@ -113,8 +116,10 @@ class Config:
     ytb_resolution: str = DEFAULT_YTB_RESOLUTION
     subtitle: SubtitleConfig = field(default_factory=SubtitleConfig)
     summary_length: int = DEFAULT_SUMMARY_LENGTH
+    summary_token_budget: int = DEFAULT_SUMMARY_TOKEN_BUDGET
     max_split_length: int = DEFAULT_MAX_SPLIT_LENGTH
     reflect_translate: bool = DEFAULT_REFLECT_TRANSLATE
+    reflect_mode: str = DEFAULT_REFLECT_MODE
     pause_before_translate: bool = DEFAULT_PAUSE_BEFORE_TRANSLATE
 
     # Dubbing Settings
@@ -154,6 +159,10 @@ class Config:
         if self.tts_method not in allowed_tts_methods:
             raise ValueError(f"TTS method must be one of {allowed_tts_methods}")
 
+        # Validate translation settings
+        if self.reflect_mode not in REFLECT_MODE_OPTIONS:
+            raise ValueError(f"Reflect mode must be one of {REFLECT_MODE_OPTIONS}")
+
         # Validate subtitle settings
         if self.subtitle.max_length <= 0:
             raise ValueError("Subtitle max length must be positive")
@@ -285,8 +294,10 @@ def load(cls) -> "Config":
     config.ffmpeg_gpu = load_key("ffmpeg_gpu")
     config.ytb_resolution = load_key("ytb_resolution")
     config.summary_length = load_key("summary_length")
+    config.summary_token_budget = load_key("summary_token_budget")
     config.max_split_length = load_key("max_split_length")
     config.reflect_translate = load_key("reflect_translate")
+    config.reflect_mode = load_key("reflect_mode")
     config.pause_before_translate = load_key("pause_before_translate")
     config.tts_method = load_key("tts_method")
     config.min_subtitle_duration = load_key("min_subtitle_duration")
@@ -309,10 +320,17 @@ Config.load = load
 
 def get_joiner(language: str) -> str:
     """Get word joiner based on language (space or empty string)"""
-    config = get_config()
-    if language in config.language_split_with_space:
+    snapshot = get_config_snapshot()
+    if snapshot is not None:
+        with_space = snapshot["language_split_with_space"]
+        without_space = snapshot["language_split_without_space"]
+    else:
+        config = get_config()
+        with_space = config.language_split_with_space
+        without_space = config.language_split_without_space
+    if language in with_space:
         return " "
-    elif language in config.language_split_without_space:
+    elif language in without_space:
         return ""
     else:
         raise ValueError(f"Unsupported language code: {language}")
@@ -32,7 +32,9 @@ DEFAULT_SUBTITLE_TARGET_MULTIPLIER = 1.2
 # ==================== LLM Processing ====================
 DEFAULT_MAX_WORKERS = 4
 DEFAULT_SUMMARY_LENGTH = 8000
+DEFAULT_SUMMARY_TOKEN_BUDGET = 60000  # Total input tokens spent on map-reduce summarization
 DEFAULT_REFLECT_TRANSLATE = True
+DEFAULT_REFLECT_MODE = "two_step"  # "two_step", "combined" or "hybrid"
 DEFAULT_PAUSE_BEFORE_TRANSLATE = False
 DEFAULT_MAX_SPLIT_LENGTH = 20
 
@@ -77,6 +79,9 @@ LANGUAGE_SPLIT_WITHOUT_SPACE = ["zh", "ja"]
 # API Format options
 API_FORMAT_OPTIONS = ["openai", "anthropic"]
 
+# Reflect translation modes
+REFLECT_MODE_OPTIONS = ["two_step", "combined", "hybrid"]
+
 # ASR Runtime options
 ASR_RUNTIME_OPTIONS = ["elevenlabs", "openai"]
 
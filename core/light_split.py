@@ -1,85 +1,190 @@
-"""Lightweight text splitting utilities without spaCy dependency."""
-import os
+"""Lightweight text splitting utilities without spaCy dependency.
+
+The passes below are generators over sentences, so they can be chained in memory
+and fed incrementally (e.g. from streaming ASR output) without intermediate files.
+"""
 import re
 import pandas as pd
-from core.utils import rprint, load_key, get_joiner
-from core.utils.models import _3_1_SPLIT_BY_NLP
+from core.utils import rprint
+from core.utils.job_context import get_job_context
+from core.utils.models import _2_CLEANED_CHUNKS, _3_1_SPLIT_BY_NLP
 
 # --------------------
-# define the intermediate files
+# precompiled patterns
 # --------------------
-SPLIT_BY_MARK_FILE = "output/log/split_by_mark.txt"
-SPLIT_BY_COMMA_FILE = "output/log/split_by_comma.txt"
-SPLIT_BY_CONNECTOR_FILE = "output/log/split_by_connector.txt"
-
+SENTENCE_END_PATTERN = re.compile(r'([。！？.!?])')
+COMMA_PATTERN = re.compile(r'([，,])')
+WORD_PATTERN = re.compile(r'\w+')
+NONSPACE_PATTERN = re.compile(r'\S+')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+EDGE_PUNCT_PATTERN = re.compile(r'^\W+|\W+$')
+PUNCT_ONLY = {',', '.', '，', '。', '？', '！', ';', '；', ':'}
 
-def simple_split_by_mark():
-    """Split text by sentence-ending punctuation marks."""
-    asr_language = load_key("asr.language")
-    language = load_key("asr.detected_language") if asr_language == 'auto' else asr_language
-    joiner = get_joiner(language)
-    rprint(f"[blue]🔍 Using {language} language joiner: '{joiner}'[/blue]")
+COMMA_SPLIT_MIN_WORDS = 40
+COMMA_PART_MAX_WORDS = 25
 
-    chunks = pd.read_excel("output/log/cleaned_chunks.xlsx")
-    chunks.text = chunks.text.apply(lambda x: x.strip('"').strip(""))
+# --------------------
+# connector splitting rules
+# --------------------
+# Words that usually open a new clause; the cut goes before them. Weak connectors
+# often sit inside a phrase ("black and white", "so much", "ever since", "even if"),
+# so they only cut where punctuation comes before them.
+STRONG_CONNECTORS = {
+    'en': ['but', 'because', 'although', 'though', 'however', 'so that', 'whereas', 'unless', 'until'],
+    'es': ['pero', 'porque', 'aunque', 'sino', 'mientras', 'entonces', 'cuando', 'donde', 'pues', 'así que', 'ya que'],
+    'fr': ['mais', 'parce que', 'bien que', 'lorsque', 'quand', 'donc', 'car', 'puis', 'alors', 'tandis que', 'pendant que'],
+    'de': ['aber', 'weil', 'obwohl', 'während', 'sondern', 'denn', 'damit', 'wenn', 'dass'],
+    'zh': ['但是', '可是', '所以', '因为', '因此', '而且', '然后', '如果', '虽然', '不过', '于是', '然而', '并且', '或者'],
+    'ja': ['そして', 'しかし', 'だから', 'それで', 'ところが', 'なので', 'つまり'],
+}
+WEAK_CONNECTORS = {
+    'en': ['and', 'or', 'that', 'who', 'so', 'since', 'while', 'then', 'which', 'where', 'if', 'when'],
+    'es': ['y', 'o', 'que', 'si'],
+    'fr': ['et', 'ou', 'qui', 'que', 'si'],
+    'de': ['und', 'oder', 'dann', 'also', 'als'],
+}
+# Japanese clause-final particles; the cut goes after them. Particles that are also
+# common word endings (から in これから, でも in 誰でも) are left out.
+CLAUSE_FINAL_CONNECTORS = {
+    'ja': ['けれども', 'けれど', 'けど', 'ので', 'ですが', 'ますが', 'ましたが', 'たら', 'ながら'],
+}
+PUNCT_WEIGHTS = {';': 3.0, '；': 3.0, ':': 2.5, '：': 2.5, '—': 2.0, ',': 2.0, '，': 2.0, '、': 1.5}
+# CJK has no word spaces, so a connector only counts when one of these (or the
+# sentence edge) sits right before it, or right after a clause-final particle
+CJK_CLAUSE_BOUNDARY = set(PUNCT_WEIGHTS) | set('。！？!?. 　')
+STRONG_CONNECTOR_WEIGHT = 1.25
+WEAK_CONNECTOR_WEIGHT = 0.75
+MIN_CONNECTOR_SCORE = 1.5  # weight * (0.5 + balance) needed to cut locally
+MIN_PART_TOKENS = 3
+CJK_LANGUAGES = ['zh', 'ja', 'ko']
+
+
+def _count_tokens(text, language):
+    """Token count matching simple_tokenize: characters for CJK, words otherwise"""
+    if language in CJK_LANGUAGES:
+        return len(text.replace(' ', ''))
+    return len(text.split())
+
+
+def _connector_candidates(sentence, language):
+    """Yield (cut offset, weight) for every plausible clause boundary in the sentence"""
+    strong = STRONG_CONNECTORS.get(language, [])
+    weak = WEAK_CONNECTORS.get(language, [])
+    if language in CJK_LANGUAGES:
+        candidates = {}
+        for pos, char in enumerate(sentence[:-1]):
+            if char in PUNCT_WEIGHTS:
+                candidates[pos + 1] = candidates.get(pos + 1, 0) + PUNCT_WEIGHTS[char]
+        for word in strong:
+            for match in re.finditer(re.escape(word), sentence):
+                start = match.start()
+                if start > 0 and sentence[start - 1] in CJK_CLAUSE_BOUNDARY:
+                    candidates[start] = candidates.get(start, 0) + STRONG_CONNECTOR_WEIGHT
+        for word in CLAUSE_FINAL_CONNECTORS.get(language, []):
+            for match in re.finditer(re.escape(word), sentence):
+                end = match.end()
+                if end < len(sentence) - 1 and sentence[end] in CJK_CLAUSE_BOUNDARY:
+                    candidates[end + 1] = candidates.get(end + 1, 0) + STRONG_CONNECTOR_WEIGHT
+        yield from candidates.items()
+        return
+
+    words = list(NONSPACE_PATTERN.finditer(sentence))
+    lowered = [EDGE_PUNCT_PATTERN.sub('', w.group().lower()) for w in words]
+    for k in range(1, len(words)):
+        weight = PUNCT_WEIGHTS.get(words[k - 1].group().rstrip('"\'»”’)')[-1:], 0)
+        for connectors, connector_weight in ((strong, STRONG_CONNECTOR_WEIGHT), (weak, WEAK_CONNECTOR_WEIGHT)):
+            if any(lowered[k:k + len(c.split())] == c.split() for c in connectors):
+                weight += connector_weight
+                break
+        if weight:
+            yield words[k].start(), weight
+
+
+def split_sentence_by_connectors(sentence, language, max_length):
+    """Recursively cut an over-length sentence at its best scored clause boundary.
+
+    Parts without a confident boundary are left whole for the LLM splitter.
+    """
+    total = _count_tokens(sentence, language)
+    if total <= max_length:
+        return [sentence]
+
+    best_cut, best_score = None, 0
+    for cut, weight in _connector_candidates(sentence, language):
+        left = _count_tokens(sentence[:cut], language)
+        right = total - left
+        if min(left, right) < MIN_PART_TOKENS:
+            continue
+        balance = 1 - abs(left - right) / total
+        score = weight * (0.5 + balance)
+        if score > best_score:
+            best_cut, best_score = cut, score
 
-    input_text = joiner.join(chunks.text.to_list())
+    if best_cut is None or best_score < MIN_CONNECTOR_SCORE:
+        return [sentence]
+    left, right = sentence[:best_cut].strip(), sentence[best_cut:].strip()
+    return split_sentence_by_connectors(left, language, max_length) + split_sentence_by_connectors(right, language, max_length)
 
-    # Sentence ending punctuation patterns
-    sentence_endings = r'([。！？.!?])'
-    # Split on endings but keep them
-    parts = re.split(sentence_endings, input_text)
 
-    sentences = []
+def _sentences_from_text(text):
+    """Split text on sentence-ending marks, keeping the marks (punctuation-only pieces are kept too)"""
+    parts = SENTENCE_END_PATTERN.split(text)
     i = 0
     while i < len(parts):
         if parts[i].strip():
-            if i + 1 < len(parts) and re.match(sentence_endings, parts[i+1]):
-                sentences.append(parts[i].strip() + parts[i+1])
+            if i + 1 < len(parts) and SENTENCE_END_PATTERN.match(parts[i+1]):
+                yield parts[i].strip() + parts[i+1]
                 i += 2
             else:
-                sentences.append(parts[i].strip())
+                yield parts[i].strip()
                 i += 1
         else:
             i += 1
 
-    # Merge lines that are just punctuation
-    cleaned_sentences = []
-    for sent in sentences:
-        stripped = sent.strip()
-        if stripped in [',', '.', '，', '。', '？', '！', ';', '；', ':']:
-            if cleaned_sentences:
-                cleaned_sentences[-1] += stripped
-        else:
-            cleaned_sentences.append(sent)
-
-    os.makedirs(os.path.dirname(SPLIT_BY_MARK_FILE), exist_ok=True)
-    with open(SPLIT_BY_MARK_FILE, "w", encoding="utf-8") as f:
-        for sent in cleaned_sentences:
-            f.write(sent + "\n")
 
-    rprint(f"[green]💾 Sentences split by punctuation marks saved to →  `{SPLIT_BY_MARK_FILE}`[/green]")
+def split_by_mark(texts, joiner):
+    """Split a stream of text chunks by sentence-ending punctuation marks.
+
+    Text after the last ending mark is buffered until more chunks arrive, and
+    lines that are just punctuation are merged into the previous sentence.
+    """
+    def complete_sentences():
+        buffer = ''
+        for text in texts:
+            buffer = joiner.join([buffer, text]) if buffer else text
+            last_end = None
+            for last_end in SENTENCE_END_PATTERN.finditer(buffer):
+                pass
+            if last_end is not None:
+                yield from _sentences_from_text(buffer[:last_end.end()])
+                buffer = buffer[last_end.end():]
+        yield from _sentences_from_text(buffer)
+
+    previous = None
+    for sent in complete_sentences():
+        if sent.strip() in PUNCT_ONLY:
+            if previous is not None:
+                previous += sent.strip()
+        else:
+            if previous is not None:
+                yield previous
+            previous = sent
+    if previous is not None:
+        yield previous
 
 
-def simple_split_by_comma():
+def split_by_comma(sentences):
     """Split long sentences by commas if they're long enough."""
-    with open(SPLIT_BY_MARK_FILE, "r", encoding="utf-8") as f:
-        sentences = [line.strip() for line in f if line.strip()]
-
-    result = []
     for sent in sentences:
         # Count words (approximate)
-        word_count = len(re.findall(r'\w+', sent))
-
-        # If sentence is short, keep as is
-        if word_count < 40:
-            result.append(sent)
+        if len(WORD_PATTERN.findall(sent)) < COMMA_SPLIT_MIN_WORDS:
+            yield sent
             continue
 
         # Try to split by comma
-        parts = re.split(r'([，,])', sent)
+        parts = COMMA_PATTERN.split(sent)
         if len(parts) <= 1:
-            result.append(sent)
+            yield sent
             continue
 
         current = ""
@@ -88,111 +193,102 @@ def simple_split_by_comma():
             punct = parts[i+1] if i+1 < len(parts) else ""
 
             current_candidate = current + part + punct
-            candidate_word_count = len(re.findall(r'\w+', current_candidate))
-
-            if candidate_word_count > 25 and current.strip():
-                result.append(current.strip())
+            if len(WORD_PATTERN.findall(current_candidate)) > COMMA_PART_MAX_WORDS and current.strip():
+                yield current.strip()
                 current = part + punct
             else:
                 current = current_candidate
 
         if current.strip():
-            result.append(current.strip())
-
-    with open(SPLIT_BY_COMMA_FILE, "w", encoding="utf-8") as f:
-        for sent in result:
-            f.write(sent + "\n")
-
-    if os.path.exists(SPLIT_BY_MARK_FILE):
-        os.remove(SPLIT_BY_MARK_FILE)
-
-    rprint(f"[green]💾 Sentences split by commas saved to →  `{SPLIT_BY_COMMA_FILE}`[/green]")
+            yield current.strip()
 
 
-def simple_split_by_connectors():
-    """Just pass through - LLM will handle real splitting."""
-    with open(SPLIT_BY_COMMA_FILE, "r", encoding="utf-8") as f:
-        sentences = [line.strip() for line in f if line.strip()]
-
-    with open(SPLIT_BY_CONNECTOR_FILE, "w", encoding="utf-8") as f:
-        for sent in sentences:
-            f.write(sent + "\n")
-
-    if os.path.exists(SPLIT_BY_COMMA_FILE):
-        os.remove(SPLIT_BY_COMMA_FILE)
-
-    rprint(f"[green]💾 Sentences saved to →  `{SPLIT_BY_CONNECTOR_FILE}`[/green]")
+def split_by_connectors(sentences, language, max_length, stats=None):
+    """Split over-length sentences locally at punctuation and connectors, leaving ambiguous ones to the LLM."""
+    for sent in sentences:
+        parts = split_sentence_by_connectors(sent, language, max_length)
+        if stats is not None and _count_tokens(sent, language) > max_length:
+            stats['long'] = stats.get('long', 0) + 1
+            if all(_count_tokens(part, language) <= max_length for part in parts):
+                stats['resolved'] = stats.get('resolved', 0) + 1
+        yield from parts
 
 
-def simple_split_long_sentences():
+def split_long_sentences(sentences, language):
     """Split extremely long sentences by word count."""
-    with open(SPLIT_BY_CONNECTOR_FILE, "r", encoding="utf-8") as f:
-        sentences = [line.strip() for line in f if line.strip()]
-
-    asr_language = load_key("asr.language")
-    language = load_key("asr.detected_language") if asr_language == 'auto' else asr_language
-    joiner = get_joiner(language)
-
-    result = []
     for sent in sentences:
         # Approximate word/token count
-        if language in ['zh', 'ja', 'ko']:
+        if language in CJK_LANGUAGES:
             # For CJK, count characters
             count = len(sent)
             max_count = 80
         else:
             # For others, count words
-            count = len(re.findall(r'\w+', sent))
+            count = len(WORD_PATTERN.findall(sent))
             max_count = 60
 
         if count <= max_count:
-            result.append(sent)
+            yield sent
             continue
 
         rprint(f"[yellow]✂️  Splitting long sentence: {sent[:30]}...[/yellow]")
 
         # Split into roughly equal parts
-        if language in ['zh', 'ja', 'ko']:
+        if language in CJK_LANGUAGES:
             # CJK: split by character count
             chars_per_part = max_count - 10
             num_parts = (count + chars_per_part - 1) // chars_per_part
             part_len = count // num_parts
-
-            parts = []
             for i in range(num_parts):
                 start = i * part_len
                 end = (i + 1) * part_len if i < num_parts - 1 else count
-                parts.append(sent[start:end])
-            result.extend(parts)
+                yield sent[start:end]
         else:
             # Others: split by words
-            words = re.findall(r'\S+', sent)
+            words = NONSPACE_PATTERN.findall(sent)
             words_per_part = max_count // 2
             num_parts = (len(words) + words_per_part - 1) // words_per_part
             part_len = len(words) // num_parts
-
-            parts = []
             for i in range(num_parts):
                 start = i * part_len
                 end = (i + 1) * part_len if i < num_parts - 1 else len(words)
-                parts.append(' '.join(words[start:end]))
-            result.extend(parts)
+                yield ' '.join(words[start:end])
 
-    with open(_3_1_SPLIT_BY_NLP, "w", encoding="utf-8") as f:
-        for sent in result:
-            f.write(sent + "\n")
 
-    if os.path.exists(SPLIT_BY_CONNECTOR_FILE):
-        os.remove(SPLIT_BY_CONNECTOR_FILE)
+def split_pipeline(texts, language, joiner, max_length, stats=None):
+    """Chain all light splitting passes over a stream of transcript text chunks."""
+    sentences = split_by_mark(texts, joiner)
+    sentences = split_by_comma(sentences)
+    sentences = split_by_connectors(sentences, language, max_length, stats)
+    return split_long_sentences(sentences, language)
+
+
+def simple_split_to_file():
+    """Run the light splitting pipeline on the ASR chunks and save the `_3_1_SPLIT_BY_NLP` file."""
+    ctx = get_job_context()
+    language, joiner = ctx.src_language, ctx.require_joiner()
+    rprint(f"[blue]🔍 Using {language} language joiner: '{joiner}'[/blue]")
+
+    chunks = pd.read_excel(_2_CLEANED_CHUNKS)
+    # Skip empty (NaN) cells rather than letting them become the word "nan"
+    texts = (str(text).strip('"').strip("") for text in chunks.text if pd.notna(text))
+    texts = (text for text in texts if text.strip())
+
+    # Split fully before touching the output, so a failure never leaves a partial
+    # file that check_file_exists would skip on the next run
+    stats = {}
+    sentences = list(split_pipeline(texts, language, joiner, ctx.max_split_length, stats))
+    with open(_3_1_SPLIT_BY_NLP, "w", encoding="utf-8") as f:
+        f.write(''.join(sent + "\n" for sent in sentences))
 
-    rprint(f"[green]💾 Long sentences split saved to →  {_3_1_SPLIT_BY_NLP}[/green]")
+    rprint(f"[green]✂️ Resolved {stats.get('resolved', 0)}/{stats.get('long', 0)} long sentences locally by connectors[/green]")
+    rprint(f"[green]💾 Sentences split saved to →  {_3_1_SPLIT_BY_NLP}[/green]")
 
 
-def simple_tokenize(text: str) -> list[str]:
+def simple_tokenize(text: str, language: str = None) -> list[str]:
     """Lightweight tokenizer using regex."""
-    language = load_key("asr.language")
-    if language == 'auto':
-        language = load_key("asr.detected_language")
+    if language is None:
+        language = get_job_context().src_language
 
     if language in ['zh', 'ja', 'ko']:
         # For CJK, just return individual characters as approximation
@@ -200,4 +296,4 @@ def simple_tokenize(text: str) -> list[str]:
         return list(text.replace(' ', ''))
     else:
         # For others, split on whitespace
-        return [w for w in re.split(r'\s+', text) if w]
+        return [w for w in WHITESPACE_PATTERN.split(text) if w]
@@ -79,6 +79,11 @@ class Paths:
         """Excel file with translation results"""
         return Paths.log_dir() / "translation_results.xlsx"
 
+    @staticmethod
+    def translation_journal() -> Path:
+        """JSON Lines journal of translated chunks, used to resume an interrupted translation"""
+        return Paths.log_dir() / "translation_journal.jsonl"
+
     @staticmethod
     def translation_results_for_subtitles() -> Path:
         """Excel file with translation results optimized for subtitles"""
@@ -159,6 +164,11 @@ class Paths:
         path.mkdir(exist_ok=True)
         return path
 
+    @staticmethod
+    def tts_calibration() -> Path:
+        """JSON store of speech rates fitted from generated TTS audio, kept across jobs"""
+        return Paths.model_cache_dir() / "tts_calibration.json"
+
     @staticmethod
     def whisperx_cache_dir() -> Path:
         """Cache directory for WhisperX models"""
@@ -233,6 +243,7 @@ _3_1_SPLIT_BY_NLP = str(Paths.split_by_nlp())
 _3_2_SPLIT_BY_MEANING = str(Paths.split_by_meaning())
 _4_1_TERMINOLOGY = str(Paths.terminology())
 _4_2_TRANSLATION = str(Paths.translation_results())
+_4_2_TRANSLATION_JOURNAL = str(Paths.translation_journal())
 _5_SPLIT_SUB = str(Paths.translation_results_for_subtitles())
 _5_REMERGED = str(Paths.translation_results_remerged())
 _8_1_AUDIO_TASK = str(Paths.tts_tasks())
@@ -261,6 +272,7 @@ __all__ = [
     "_3_2_SPLIT_BY_MEANING",
     "_4_1_TERMINOLOGY",
     "_4_2_TRANSLATION",
+    "_4_2_TRANSLATION_JOURNAL",
     "_5_SPLIT_SUB",
     "_5_REMERGED",
     "_8_1_AUDIO_TASK",
@@ -39,6 +39,47 @@ Split the given subtitle text into **{num_parts}** parts, each less than **{word
 }}
 ```
 
+Note: Start you answer with ```json and end with ```, do not add any other text.
+""".strip()
+    return split_prompt
+
+def get_split_batch_prompt(items, word_limit = 20):
+    """items: list of (sentence_id, sentence, num_parts)"""
+    language = load_key("asr.detected_language")
+    sentences = '\n'.join(
+        f'<sentence id="{sentence_id}" parts="{num_parts}">{sentence}</sentence>'
+        for sentence_id, sentence, num_parts in items
+    )
+    json_format = ',\n'.join(
+        f'    "{sentence_id}": {{"split": "Sentence {sentence_id} with [br] tags at split positions"}}'
+        for sentence_id, _, _ in items
+    )
+    split_prompt = f"""
+## Role
+You are a professional Netflix subtitle splitter in **{language}**.
+
+## Task
+Split each given subtitle sentence into the number of parts given by its `parts` attribute, each less than **{word_limit}** words.
+
+1. Maintain sentence meaning coherence according to Netflix subtitle standards
+2. MOST IMPORTANT: Keep parts roughly equal in length (minimum 3 words each)
+3. Split at natural points like punctuation marks or conjunctions
+4. If provided text is repeated words, simply split at the middle of the repeated words.
+5. Never change, add or remove words: only insert [br] tags
+6. Handle every sentence independently and answer for every sentence id
+
+## Given Sentences
+<split_these_sentences>
+{sentences}
+</split_these_sentences>
+
+## Output in only JSON format and no other text
+```json
+{{
+{json_format}
+}}
+```
+
 Note: Start you answer with ```json and end with ```, do not add any other text.
 """.strip()
     return split_prompt
@@ -123,6 +164,36 @@ Note: Start you answer with ```json and end with ```, do not add any other text.
 """.strip()
     return summary_prompt
 
+def get_summary_reduce_prompt(window_themes):
+    src_lang = load_key("asr.detected_language")
+    tgt_lang = load_key("target_language")
+    themes = '\n'.join(f'{i+1}. {theme}' for i, theme in enumerate(window_themes))
+
+    reduce_prompt = f"""
+## Role
+You are a video translation expert, specializing in {src_lang} comprehension and {tgt_lang} expression optimization.
+
+## Task
+The {src_lang} video text was summarized section by section. Combine the section summaries below into one summary of the whole video, written in {tgt_lang}:
+1. First sentence: the main topic of the whole video
+2. Second sentence: the key points covered across sections
+
+## INPUT
+<section_summaries>
+{themes}
+</section_summaries>
+
+## Output in only JSON format and no other text
+```json
+{{
+  "theme": "Two-sentence video summary"
+}}
+```
+
+Note: Start you answer with ```json and end with ```, do not add any other text.
+""".strip()
+    return reduce_prompt
+
 ## ================================================================
 # @ step5_translate.py & translate_lines.py
 def generate_shared_prompt(previous_content_prompt, after_content_prompt, summary_prompt, things_to_note_prompt):
@@ -247,6 +318,49 @@ Note: Start you answer with ```json and end with ```, do not add any other text.
     return prompt_expressiveness.strip()
 
 
+def get_prompt_combined(lines, shared_prompt):
+    TARGET_LANGUAGE = load_key("target_language")
+    line_splits = lines.split('\n')
+
+    json_dict = {}
+    for i, line in enumerate(line_splits, 1):
+        json_dict[f"{i}"] = {
+            "origin": line,
+            "direct": f"direct {TARGET_LANGUAGE} translation {i}.",
+            "free": f"free {TARGET_LANGUAGE} translation {i}."
+        }
+    json_format = json.dumps(json_dict, indent=2, ensure_ascii=False)
+
+    src_language = load_key("asr.detected_language")
+    prompt_combined = f'''
+## Role
+You are a professional Netflix subtitle translator and language consultant, fluent in both {src_language} and {TARGET_LANGUAGE}, as well as their respective cultures.
+
+## Task
+Translate the original {src_language} subtitles into {TARGET_LANGUAGE} line by line, producing two versions of every line in a single answer:
+
+1. direct: a faithful translation that accurately conveys the original meaning, without changing, adding, or omitting content
+2. free: a polished version of your direct translation that is natural, fluent and concise, conforming to {TARGET_LANGUAGE} expression habits
+3. Use professional terms correctly and consistently, considering the context
+4. Do not add comments or explanations, and do not leave empty lines, as the subtitles are for the audience to read
+
+{shared_prompt}
+
+## INPUT
+<subtitles>
+{lines}
+</subtitles>
+
+## Output in only JSON format and no other text
+```json
+{json_format}
+```
+
+Note: Start you answer with ```json and end with ```, do not add any other text.
+'''
+    return prompt_combined.strip()
+
+
 ## ================================================================
 # @ step6_splitforsub.py
 def get_align_prompt(src_sub, tr_sub, src_part):
@@ -297,16 +411,63 @@ Note: Start you answer with ```json and end with ```, do not add any other text.
 '''.strip()
     return align_prompt
 
+def get_split_align_prompt(src_sub, tr_sub, num_parts=2, word_limit=20):
+    """Split a source subtitle and align its translation to the parts in one request"""
+    targ_lang = load_key("target_language")
+    src_lang = load_key("asr.detected_language")
+    align_parts_json = ','.join(
+        f'''
+        {{
+            "src_part_{i+1}": "Part {i+1} of the {src_lang} subtitle, copied verbatim",
+            "target_part_{i+1}": "Corresponding aligned {targ_lang} subtitle part"
+        }}''' for i in range(num_parts)
+    )
+
+    split_align_prompt = f'''
+## Role
+You are a Netflix subtitle splitting and alignment expert fluent in both {src_lang} and {targ_lang}.
+
+## Task
+We have a {src_lang} subtitle and its {targ_lang} translation that are too long to display.
+Split the {src_lang} subtitle into **{num_parts}** parts, then split the {targ_lang} subtitle to match those parts.
+
+1. Split the {src_lang} subtitle at natural points like punctuation marks or conjunctions, each part less than **{word_limit}** words
+2. Keep parts roughly equal in length, and copy the {src_lang} text verbatim without changing any words
+3. Analyze the word order and structural correspondence between {src_lang} and {targ_lang}, and split the {targ_lang} subtitle accordingly
+4. Never leave empty parts. If it's difficult to split the {targ_lang} subtitle based on meaning, you may appropriately rewrite it
+5. Do not add comments or explanations in the translation, as the subtitles are for the audience to read
+
+## INPUT
+<subtitles>
+{src_lang} Original: "{src_sub}"
+{targ_lang} Original: "{tr_sub}"
+</subtitles>
+
+## Output in only JSON format and no other text
+```json
+{{
+    "analysis": "Brief analysis of split points, word order, and structural correspondence between two subtitles",
+    "align": [
+        {align_parts_json}
+    ]
+}}
+```
+
+Note: Start you answer with ```json and end with ```, do not add any other text.
+'''.strip()
+    return split_align_prompt
+
 ## ================================================================
 # @ step8_gen_audio_task.py @ step10_gen_audio.py
-def get_subtitle_trim_prompt(text, duration):
- 
-    rule = '''Consider a. Reducing filler words without modifying meaningful content. b. Omitting unnecessary modifiers or pronouns, for example:
+SUBTITLE_TRIM_RULE = '''Consider a. Reducing filler words without modifying meaningful content. b. Omitting unnecessary modifiers or pronouns, for example:
     - "Please explain your thought process" can be shortened to "Please explain thought process"
     - "We need to carefully analyze this complex problem" can be shortened to "We need to analyze this problem"
     - "Let's discuss the various different perspectives on this topic" can be shortened to "Let's discuss different perspectives on this topic"
     - "Can you describe in detail your experience from yesterday" can be shortened to "Can you describe yesterday's experience" '''
 
+def get_subtitle_trim_prompt(text, duration):
+    rule = SUBTITLE_TRIM_RULE
+
     trim_prompt = f'''
 ## Role
 You are a professional subtitle editor, editing and optimizing lengthy subtitles that exceed voiceover time before handing them to voice actors. 
@@ -334,6 +495,45 @@ Please follow these steps and provide the results in the JSON output:
 }}
 ```
 
+Note: Start you answer with ```json and end with ```, do not add any other text.
+'''.strip()
+    return trim_prompt
+
+def get_subtitle_trim_batch_prompt(items):
+    """items: list of (subtitle_id, text, duration)"""
+    subtitles = '\n'.join(
+        f'<subtitle id="{subtitle_id}" duration="{duration:.2f}">{text}</subtitle>'
+        for subtitle_id, text, duration in items
+    )
+    json_format = ',\n'.join(
+        f'    "{subtitle_id}": {{"result": "Shortened subtitle {subtitle_id} in the original subtitle language"}}'
+        for subtitle_id, _, _ in items
+    )
+
+    trim_prompt = f'''
+## Role
+You are a professional subtitle editor, editing and optimizing lengthy subtitles that exceed voiceover time before handing them to voice actors. 
+Your expertise lies in cleverly shortening subtitles slightly while ensuring the original meaning and structure remain unchanged.
+
+## INPUT
+Each subtitle below is too long to be read within its duration (in seconds).
+<subtitles>
+{subtitles}
+</subtitles>
+
+## Processing Rules
+{SUBTITLE_TRIM_RULE}
+
+## Processing Steps
+Trim every subtitle independently, making it more concise according to the processing rules so it fits its own duration.
+
+## Output in only JSON format and no other text
+```json
+{{
+{json_format}
+}}
+```
+
 Note: Start you answer with ```json and end with ```, do not add any other text.
 '''.strip()
     return trim_prompt
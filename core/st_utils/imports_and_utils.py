@@ -1,6 +1,7 @@
 import os
 import streamlit as st
 import io, zipfile
+from core.utils.subtitle_formats import SUBTITLE_EXTENSIONS
 from core.st_utils.download_video_section import download_video_section
 from core.st_utils.sidebar_setting import page_setting
 from translations.translations import translate as t
@@ -11,7 +12,7 @@ def download_subtitle_zip_button(text: str):
     
     with zipfile.ZipFile(zip_buffer, "w") as zip_file:
         for file_name in os.listdir(output_dir):
-            if file_name.endswith(".srt"):
+            if file_name.endswith(SUBTITLE_EXTENSIONS):
                 file_path = os.path.join(output_dir, file_name)
                 with open(file_path, "rb") as file:
                     zip_file.writestr(file_name, file.read())
@@ -10,6 +10,7 @@ from core.constants import (
     OPENAI_TTS_MODEL_OPTIONS,
     ASR_RUNTIME_OPTIONS,
     API_FORMAT_OPTIONS,
+    REFLECT_MODE_OPTIONS,
     ASR_LANGUAGE_OPTIONS,
     DEFAULT_OPENAI_TTS_VOICE,
     DEFAULT_OPENAI_TTS_MODEL,
@@ -289,6 +290,18 @@ def page_setting():
                 update_key("reflect_translate", reflect_translate)
                 st.rerun()
 
+            if reflect_translate:
+                current_reflect_mode = load_key("reflect_mode") or REFLECT_MODE_OPTIONS[0]
+                reflect_mode = st.selectbox(
+                    t("Reflect Mode"),
+                    options=REFLECT_MODE_OPTIONS,
+                    index=REFLECT_MODE_OPTIONS.index(current_reflect_mode) if current_reflect_mode in REFLECT_MODE_OPTIONS else 0,
+                    help=t("two_step: separate faithful and expressive passes; combined: both in one request; hybrid: expressive pass only for flagged lines"),
+                    key="adv_reflect_mode"
+                )
+                if reflect_mode != load_key("reflect_mode"):
+                    update_key("reflect_mode", reflect_mode)
+
             pause_before_translate = st.toggle(t("Pause Before Translate"), value=load_key("pause_before_translate"), help=t("Pause to allow terminology adjustment"), key="adv_pause")
             if pause_before_translate != load_key("pause_before_translate"):
                 update_key("pause_before_translate", pause_before_translate)
@@ -1,4 +1,5 @@
-from core.prompts import generate_shared_prompt, get_prompt_faithfulness, get_prompt_expressiveness
+import re
+from core.prompts import generate_shared_prompt, get_prompt_faithfulness, get_prompt_expressiveness, get_prompt_combined
 from rich.panel import Panel
 from rich.console import Console
 from rich.table import Table
@@ -18,68 +19,112 @@ def valid_translate_result(result: dict, required_keys: list, required_sub_keys:
 
     return {"status": "success", "message": "Translation completed"}
 
+# Hybrid mode: lines this long (in words) are always polished by the expressiveness pass
+HYBRID_LONG_LINE_WORDS = 15
+# Hybrid mode: this many consecutive source words left in the direct translation means it needs polishing
+HYBRID_COPIED_WORDS = 3
+# CJK text has no spaces: each character is one token, worth about half a word
+HYBRID_CJK_CHAR_WORDS = 0.5
+_CJK_CHARS = '\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af'
+HYBRID_CJK_CHAR_PATTERN = re.compile(f'[{_CJK_CHARS}]')
+HYBRID_TOKEN_PATTERN = re.compile(f'[{_CJK_CHARS}]|[^\\s{_CJK_CHARS}]+')
+
+def needs_reflection(origin, direct):
+    """Cheap heuristic for hybrid mode: flag direct translations worth a second, expressive pass"""
+    origin, direct = origin.strip().lower(), direct.strip().lower()
+    if not direct or direct == origin:
+        return True
+    tokens = list(HYBRID_TOKEN_PATTERN.finditer(origin))
+    weights = [HYBRID_CJK_CHAR_WORDS if HYBRID_CJK_CHAR_PATTERN.fullmatch(t.group()) else 1 for t in tokens]
+    if sum(weights) >= HYBRID_LONG_LINE_WORDS:
+        return True
+    # Untranslated fragments (worth HYBRID_COPIED_WORDS words) copied from the source line
+    for i in range(len(tokens)):
+        words = 0
+        for j in range(i, len(tokens)):
+            words += weights[j]
+            if words >= HYBRID_COPIED_WORDS:
+                if origin[tokens[i].start():tokens[j].end()] in direct:
+                    return True
+                break
+    return False
+
+def print_translation_table(faith_result, express_result=None):
+    table = Table(title="Translation Results", show_header=False, box=box.ROUNDED)
+    table.add_column("Translations", style="bold")
+    for i, key in enumerate(faith_result):
+        table.add_row(f"[cyan]Origin:  {faith_result[key]['origin']}[/cyan]")
+        table.add_row(f"[magenta]Direct:  {faith_result[key]['direct']}[/magenta]")
+        if express_result is not None:
+            table.add_row(f"[green]Free:    {express_result[key]['free']}[/green]")
+        if i < len(faith_result) - 1:
+            table.add_row("[yellow]" + "-" * 50 + "[/yellow]")
+    console.print(table)
+
 def translate_lines(lines, previous_content_prompt, after_cotent_prompt, things_to_note_prompt, summary_prompt, index = 0):
     shared_prompt = generate_shared_prompt(previous_content_prompt, after_cotent_prompt, summary_prompt, things_to_note_prompt)
+    line_splits = lines.split('\n')
 
     # Retry translation if the length of the original text and the translated text are not the same, or if the specified key is missing
     def retry_translation(prompt, length, step_name):
-        def valid_faith(response_data):
-            return valid_translate_result(response_data, [str(i) for i in range(1, length+1)], ['direct'])
-        def valid_express(response_data):
-            return valid_translate_result(response_data, [str(i) for i in range(1, length+1)], ['free'])
+        sub_keys = {'faithfulness': ['direct'], 'expressiveness': ['free'], 'combined': ['direct', 'free']}[step_name]
+        def valid_result(response_data):
+            return valid_translate_result(response_data, [str(i) for i in range(1, length+1)], sub_keys)
         for retry in range(3):
-            if step_name == 'faithfulness':
-                result = ask_gpt(prompt+retry* " ", resp_type='json', valid_def=valid_faith, log_title=f'translate_{step_name}')
-            elif step_name == 'expressiveness':
-                result = ask_gpt(prompt+retry* " ", resp_type='json', valid_def=valid_express, log_title=f'translate_{step_name}')
-            if len(lines.split('\n')) == len(result):
+            result = ask_gpt(prompt+retry* " ", resp_type='json', valid_def=valid_result, log_title=f'translate_{step_name}')
+            if length == len(result):
                 return result
             if retry != 2:
                 console.print(f'[yellow]⚠️ {step_name.capitalize()} translation of block {index} failed, Retry...[/yellow]')
         raise ValueError(f'[red]❌ {step_name.capitalize()} translation of block {index} failed after 3 retries. Please check `output/gpt_log/error.json` for more details.[/red]')
 
-    ## Step 1: Faithful to the Original Text
-    prompt1 = get_prompt_faithfulness(lines, shared_prompt)
-    faith_result = retry_translation(prompt1, len(lines.split('\n')), 'faithfulness')
+    reflect_translate = load_key('reflect_translate')
+    reflect_mode = load_key('reflect_mode') or 'two_step'
 
-    for i in faith_result:
-        faith_result[i]["direct"] = faith_result[i]["direct"].replace('\n', ' ')
+    if reflect_translate and reflect_mode == 'combined':
+        ## Single pass: faithful and expressive translation in one response
+        prompt = get_prompt_combined(lines, shared_prompt)
+        combined_result = retry_translation(prompt, len(line_splits), 'combined')
+        faith_result, express_result = {}, {}
+        for i, key in enumerate(combined_result):
+            faith_result[key] = {"origin": line_splits[i], "direct": combined_result[key]["direct"].replace('\n', ' ')}
+            express_result[key] = {"free": combined_result[key]["free"]}
+    else:
+        ## Step 1: Faithful to the Original Text
+        prompt1 = get_prompt_faithfulness(lines, shared_prompt)
+        faith_result = retry_translation(prompt1, len(line_splits), 'faithfulness')
+
+        for i in faith_result:
+            faith_result[i]["direct"] = faith_result[i]["direct"].replace('\n', ' ')
 
-    # If reflect_translate is False or not set, use faithful translation directly
-    reflect_translate = load_key('reflect_translate')
-    if not reflect_translate:
         # If reflect_translate is False or not set, use faithful translation directly
-        translate_result = "\n".join([faith_result[i]["direct"].strip() for i in faith_result])
-        
-        table = Table(title="Translation Results", show_header=False, box=box.ROUNDED)
-        table.add_column("Translations", style="bold")
-        for i, key in enumerate(faith_result):
-            table.add_row(f"[cyan]Origin:  {faith_result[key]['origin']}[/cyan]")
-            table.add_row(f"[magenta]Direct:  {faith_result[key]['direct']}[/magenta]")
-            if i < len(faith_result) - 1:
-                table.add_row("[yellow]" + "-" * 50 + "[/yellow]")
-        
-        console.print(table)
-        return translate_result, lines
-
-    ## Step 2: Express Smoothly  
-    prompt2 = get_prompt_expressiveness(faith_result, lines, shared_prompt)
-    express_result = retry_translation(prompt2, len(lines.split('\n')), 'expressiveness')
+        if not reflect_translate:
+            translate_result = "\n".join([faith_result[i]["direct"].strip() for i in faith_result])
+            print_translation_table(faith_result)
+            return translate_result, lines
 
-    table = Table(title="Translation Results", show_header=False, box=box.ROUNDED)
-    table.add_column("Translations", style="bold")
-    for i, key in enumerate(express_result):
-        table.add_row(f"[cyan]Origin:  {faith_result[key]['origin']}[/cyan]")
-        table.add_row(f"[magenta]Direct:  {faith_result[key]['direct']}[/magenta]")
-        table.add_row(f"[green]Free:    {express_result[key]['free']}[/green]")
-        if i < len(express_result) - 1:
-            table.add_row("[yellow]" + "-" * 50 + "[/yellow]")
+        ## Step 2: Express Smoothly
+        if reflect_mode == 'hybrid':
+            # Only send flagged lines to the expressiveness pass, keep direct translations for the rest
+            flagged = [key for key in faith_result if needs_reflection(faith_result[key].get("origin", line_splits[int(key)-1]), faith_result[key]["direct"])]
+            express_result = {key: {"free": faith_result[key]["direct"]} for key in faith_result}
+            if flagged:
+                sub_faith = {str(j): faith_result[key] for j, key in enumerate(flagged, 1)}
+                sub_lines = '\n'.join(line_splits[int(key)-1] for key in flagged)
+                prompt2 = get_prompt_expressiveness(sub_faith, sub_lines, shared_prompt)
+                sub_express = retry_translation(prompt2, len(flagged), 'expressiveness')
+                for j, key in enumerate(flagged, 1):
+                    express_result[key] = sub_express[str(j)]
+            console.print(f'[cyan]Block {index}: {len(flagged)}/{len(faith_result)} lines sent to expressiveness pass[/cyan]')
+        else:
+            prompt2 = get_prompt_expressiveness(faith_result, lines, shared_prompt)
+            express_result = retry_translation(prompt2, len(line_splits), 'expressiveness')
 
-    console.print(table)
+    print_translation_table(faith_result, express_result)
 
     translate_result = "\n".join([express_result[i]["free"].replace('\n', ' ').strip() for i in express_result])
 
-    if len(lines.split('\n')) != len(translate_result.split('\n')):
+    if len(line_splits) != len(translate_result.split('\n')):
         console.print(Panel(f'[red]❌ Translation of block {index} failed, Length Mismatch, Please check `output/gpt_log/translate_expressiveness.json`[/red]'))
         raise ValueError(f'Origin ···{lines}···,\nbut got ···{translate_result}···')
 
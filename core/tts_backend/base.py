@@ -6,10 +6,19 @@ All TTS implementations should inherit from this class and implement the require
 """
 
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
 from typing import Optional
 import pandas as pd
 
 
+@dataclass(frozen=True)
+class SynthesisResult:
+    """Audio a backend produced, so callers need not decode the saved file again."""
+    duration: float
+    # False for placeholder silence or a file kept from an earlier run
+    synthesized: bool = True
+
+
 class TTSBackend(ABC):
     """Abstract base class for TTS backends."""
 
@@ -20,7 +29,7 @@ class TTSBackend(ABC):
         output_path: str,
         number: Optional[int] = None,
         task_df: Optional[pd.DataFrame] = None
-    ) -> None:
+    ) -> Optional[SynthesisResult]:
         """
         Synthesize text to audio and save to file.
 
@@ -29,6 +38,9 @@ class TTSBackend(ABC):
             output_path: Path where the audio file should be saved
             number: Optional segment number for reference
             task_df: Optional DataFrame with task context
+
+        Returns:
+            The synthesized audio when the backend has it in memory, otherwise None
         """
         pass
 
@@ -0,0 +1,147 @@
+"""
+TTS speech-rate calibration
+
+The duration estimator assumes a fixed number of seconds per syllable for each
+language, while the real rate depends on the TTS voice. Every generated line
+gives a (syllables, seconds) sample; this module fits a rate per
+(tts_method, voice, language) by least squares through the origin and keeps the
+running sums in a JSON store, so estimates improve across jobs.
+"""
+import json
+import os
+import threading
+
+from core.paths import Paths
+from core.tts_backend.estimate_duration import get_estimator
+from core.utils.config_utils import load_key
+
+# A fitted rate is only used once it rests on this many lines
+MIN_CALIBRATION_SAMPLES = 20
+# Older samples are down-weighted beyond this many, so a changed voice re-adapts
+MAX_CALIBRATION_SAMPLES = 2000
+# Fitted rates are clamped to this factor around the estimator's default rate
+MAX_RATE_DEVIATION = 2.0
+
+VOICE_KEYS = {
+    'edge_tts': 'edge_tts.voice',
+    'openai_tts': 'openai_tts.voice',
+}
+
+_store_lock = threading.Lock()
+_store_cache = None
+_store_mtime = None
+
+
+def _load_store() -> dict:
+    """Load the calibration store, re-reading it only when the file changed"""
+    global _store_cache, _store_mtime
+    path = Paths.tts_calibration()
+    mtime = os.path.getmtime(path) if os.path.exists(path) else None
+    if _store_cache is None or mtime != _store_mtime:
+        store = {}
+        if mtime is not None:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    store = json.load(f)
+            except (OSError, ValueError):
+                store = {}
+        _store_cache, _store_mtime = store, mtime
+    return _store_cache
+
+
+def _save_store(store: dict) -> None:
+    global _store_cache, _store_mtime
+    path = Paths.tts_calibration()
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(store, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+    _store_cache, _store_mtime = store, os.path.getmtime(path)
+
+
+def current_voice(tts_method: str | None = None) -> tuple[str, str]:
+    """(tts_method, voice) of the configured TTS backend"""
+    tts_method = tts_method or load_key("tts_method")
+    voice_key = VOICE_KEYS.get(tts_method)
+    return tts_method, (load_key(voice_key) if voice_key else '') or 'default'
+
+
+def calibration_key(tts_method: str, voice: str, lang: str) -> str:
+    return f"{tts_method}|{voice}|{lang}"
+
+
+def get_speech_rates(tts_method: str | None = None, voice: str | None = None) -> dict:
+    """
+    Calibrated seconds per syllable by language for a voice (the current one by default).
+
+    Only languages with enough samples are returned; pass the result as `rates` to the
+    estimator, which keeps its defaults for everything else.
+    """
+    if voice is None:
+        tts_method, voice = current_voice(tts_method)
+    defaults = get_estimator().duration_params
+    prefix = calibration_key(tts_method, voice, '')
+    with _store_lock:
+        store = _load_store()
+    rates = {}
+    for key, stats in store.items():
+        if not key.startswith(prefix) or stats.get('count', 0) < MIN_CALIBRATION_SAMPLES or stats.get('sum_xx', 0) <= 0:
+            continue
+        lang = key[len(prefix):]
+        default = defaults.get(lang, defaults['default'])
+        rate = stats['sum_xy'] / stats['sum_xx']
+        rates[lang] = min(max(rate, default / MAX_RATE_DEVIATION), default * MAX_RATE_DEVIATION)
+    return rates
+
+
+def record_tts_durations(samples, tts_method: str | None = None, voice: str | None = None) -> int:
+    """
+    Fold (text, real_duration) samples of generated lines into the store.
+
+    Lines mixing several languages are skipped, since their time cannot be attributed
+    to one rate. Returns the number of samples used.
+    """
+    if voice is None:
+        tts_method, voice = current_voice(tts_method)
+    estimator = get_estimator()
+    updates = {}
+    for text, real_dur in samples:
+        if not text or not isinstance(text, str) or not real_dur:
+            continue
+        result = estimator.process_mixed_text(text)
+        if len(result['language_breakdown']) != 1:
+            continue
+        lang, info = next(iter(result['language_breakdown'].items()))
+        syllables = info['syllables']
+        if syllables <= 0:
+            continue
+        # Pauses for spaces and punctuation are modelled separately; fit the spoken part only
+        default = estimator.duration_params.get(lang, estimator.duration_params['default'])
+        pause_dur = result['estimated_duration'] - syllables * default
+        spoken_dur = real_dur - pause_dur
+        if spoken_dur <= 0:
+            continue
+        stats = updates.setdefault(lang, {'sum_xy': 0.0, 'sum_xx': 0.0, 'count': 0})
+        stats['sum_xy'] += syllables * spoken_dur
+        stats['sum_xx'] += syllables * syllables
+        stats['count'] += 1
+
+    if not updates:
+        return 0
+    with _store_lock:
+        store = dict(_load_store())
+        for lang, new in updates.items():
+            key = calibration_key(tts_method, voice, lang)
+            stats = dict(store.get(key, {'sum_xy': 0.0, 'sum_xx': 0.0, 'count': 0}))
+            total = stats['count'] + new['count']
+            if total > MAX_CALIBRATION_SAMPLES:
+                # Keep the sums' ratio but shrink their weight, favouring recent samples
+                decay = max(0.0, (MAX_CALIBRATION_SAMPLES - new['count']) / stats['count']) if stats['count'] else 0.0
+                stats = {k: stats[k] * decay for k in ('sum_xy', 'sum_xx', 'count')}
+            store[key] = {
+                'sum_xy': stats['sum_xy'] + new['sum_xy'],
+                'sum_xx': stats['sum_xx'] + new['sum_xx'],
+                'count': stats['count'] + new['count'],
+            }
+        _save_store(store)
+    return sum(stats['count'] for stats in updates.values())
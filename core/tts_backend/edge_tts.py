@@ -1,8 +1,12 @@
+import asyncio
+import os
+import threading
 from pathlib import Path
-import edge_tts
+from typing import Callable, Optional
+
+from core.tts_backend.base import TTSBackend
 from core.utils import *
 from core.constants import DEFAULT_EDGE_TTS_VOICE
-import subprocess
 
 # Available voices can be listed using edge-tts --list-voices command
 # Common English voices:
@@ -13,17 +17,117 @@ import subprocess
 # zh-CN-XiaoxiaoNeural - Female
 # zh-CN-YunxiNeural - Male
 # zh-CN-XiaoyiNeural - Female
+
+# Websocket sessions open at once across all callers
+EDGE_TTS_CONCURRENCY = 8
+# Seconds to wait for one line before giving up on it
+EDGE_TTS_TIMEOUT = 120
+
+
+def _default_communicate(text: str, voice: str):
+    from edge_tts import Communicate
+    return Communicate(text, voice)
+
+
+class EdgeTTSBackend(TTSBackend):
+    """
+    Edge TTS synthesized in-process on one background event loop.
+
+    Callers on any thread submit lines to the shared loop; a semaphore bounds the
+    open websocket sessions and audio chunks are streamed straight to disk.
+    `communicate_factory(text, voice)` must return an object with an async
+    `stream()` yielding edge_tts-style chunks, so a local mock can stand in for
+    the service.
+    """
+
+    def __init__(self, voice: Optional[str] = None, concurrency: int = EDGE_TTS_CONCURRENCY,
+                 communicate_factory: Optional[Callable] = None):
+        self.voice = voice
+        self.concurrency = concurrency
+        self.communicate_factory = communicate_factory or _default_communicate
+        self._loop = None
+        self._semaphore = None
+        self._lock = threading.Lock()
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="edge-tts-loop", daemon=True).start()
+                self._semaphore = asyncio.run_coroutine_threadsafe(self._make_semaphore(), loop).result()
+                self._loop = loop
+            return self._loop
+
+    async def _make_semaphore(self) -> asyncio.Semaphore:
+        return asyncio.Semaphore(self.concurrency)
+
+    async def synthesize_async(self, text: str, output_path: str, voice: str) -> int:
+        """Stream one line's audio into output_path; returns the number of bytes written"""
+        tmp_path = f"{output_path}.part"
+        written = 0
+        async with self._semaphore:
+            communicate = self.communicate_factory(text, voice)
+            try:
+                with open(tmp_path, 'wb') as f:
+                    async for chunk in communicate.stream():
+                        if chunk["type"] == "audio":
+                            f.write(chunk["data"])
+                            written += len(chunk["data"])
+                if not written:
+                    raise RuntimeError(f"Edge TTS returned no audio for: {text}")
+                os.replace(tmp_path, output_path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+        return written
+
+    def synthesize(self, text, output_path, number=None, task_df=None) -> None:
+        voice = self.voice or load_key("edge_tts.voice") or DEFAULT_EDGE_TTS_VOICE
+        speech_file_path = Path(output_path)
+        speech_file_path.parent.mkdir(parents=True, exist_ok=True)
+
+        future = asyncio.run_coroutine_threadsafe(
+            self.synthesize_async(text, str(speech_file_path), voice), self._get_loop()
+        )
+        try:
+            future.result(timeout=EDGE_TTS_TIMEOUT)
+        except TimeoutError:
+            future.cancel()
+            raise
+        print(f"Audio saved to {speech_file_path}")
+
+    @property
+    def name(self) -> str:
+        return "edge_tts"
+
+    @property
+    def supports_ssml(self) -> bool:
+        return False
+
+    @property
+    def available_voices(self) -> list:
+        from edge_tts import list_voices
+        voices = asyncio.run_coroutine_threadsafe(list_voices(), self._get_loop()).result(timeout=EDGE_TTS_TIMEOUT)
+        return [voice["ShortName"] for voice in voices]
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_edge_tts_backend() -> EdgeTTSBackend:
+    """The process-wide Edge TTS backend, so every line shares one loop and semaphore"""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = EdgeTTSBackend()
+    return _backend
+
+
 def edge_tts(text, save_path):
-    # Load settings from config file
-    voice = load_key("edge_tts.voice") or DEFAULT_EDGE_TTS_VOICE
-    
-    # Create output directory if it doesn't exist
-    speech_file_path = Path(save_path)
-    speech_file_path.parent.mkdir(parents=True, exist_ok=True)
-    
-    cmd = ["edge-tts", "--voice", voice, "--text", text, "--write-media", str(speech_file_path)]
-    subprocess.run(cmd, check=True)
-    print(f"Audio saved to {speech_file_path}")
+    get_edge_tts_backend().synthesize(text, save_path)
+
 
 if __name__ == "__main__":
     edge_tts("Today is a good day!", "edge_tts.wav")
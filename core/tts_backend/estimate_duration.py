@@ -1,20 +1,63 @@
-import syllables
-from pypinyin import pinyin, Style
-from g2p_en import G2p
 import re
+import threading
+from functools import lru_cache
+
+# syllables, pypinyin and g2p_en are imported on first use: g2p_en alone pulls in
+# NLTK and a neural model, which would otherwise slow down every importer of this module
+
+# Distinct words whose syllable counts are remembered across calls
+WORD_SYLLABLE_CACHE_SIZE = 50000
+
+_g2p = None
+
+
+def _get_g2p():
+    """Build the G2p model on first use; it loads NLTK data and a neural model"""
+    global _g2p
+    if _g2p is None:
+        from g2p_en import G2p
+        _g2p = G2p()
+    return _g2p
+
+
+@lru_cache(maxsize=WORD_SYLLABLE_CACHE_SIZE)
+def english_word_syllables(word: str) -> int:
+    import syllables
+    try:
+        return syllables.estimate(word)
+    except:
+        phones = _get_g2p()(word)
+        return max(1, len([p for p in phones if any(c in p for c in 'aeiou')]))
+
 
 class AdvancedSyllableEstimator:
     def __init__(self):
-        self.g2p_en = G2p()
         self.duration_params = {'en': 0.225, 'zh': 0.21, 'ja': 0.21, 'fr': 0.22, 'es': 0.22, 'ko': 0.21, 'default': 0.22}
-        self.lang_patterns = {
+        self.lang_patterns = {lang: re.compile(pattern) for lang, pattern in {
             'zh': r'[\u4e00-\u9fff]', 'ja': r'[\u3040-\u309f\u30a0-\u30ff]',
-            'fr': r'[àâçéèêëîïôùûüÿœæ]', 'es': r'[áéíóúñ¿¡]', 'en': r'[a-zA-Z]+', 'ko': r'[\uac00-\ud7af\u1100-\u11ff]'}
+            'fr': r'[àâçéèêëîïôùûüÿœæ]', 'es': r'[áéíóúñ¿¡]', 'en': r'[a-zA-Z]+', 'ko': r'[\uac00-\ud7af\u1100-\u11ff]'}.items()}
         self.lang_joiners = {'zh': '', 'ja': '', 'en': ' ', 'fr': ' ', 'es': ' ', 'ko': ' '}
         self.punctuation = {
             'mid': r'[，；：,;、]+', 'end': r'[。！？.!?]+', 'space': r'\s+',
             'pause': {'space': 0.15, 'default': 0.1}
         }
+        self.segment_pattern = re.compile(f"({self.punctuation['space']}|{self.punctuation['mid']}|{self.punctuation['end']})")
+        self.space_pattern = re.compile(self.punctuation['space'])
+        self.punct_pattern = re.compile(f"{self.punctuation['mid']}|{self.punctuation['end']}")
+        self.vowel_patterns = {
+            'fr': re.compile('[aeiouyàâéèêëîïôùûüÿœæ]+'),
+            'es': re.compile('[aeiouáéíóúü]+'),
+        }
+        self.fr_silent_e_pattern = re.compile(r'e\b')
+        self.non_hanzi_pattern = re.compile(r'[^\u4e00-\u9fff]')
+        self.ja_youon_pattern = re.compile(r'[きぎしじちぢにひびぴみり][ょゅゃ]')
+        self.ja_skip_pattern = re.compile(r'[っー]')
+        self.ja_mora_pattern = re.compile(r'[\u3040-\u309f\u30a0-\u30ff\u4e00-\u9fff]')
+        self.ko_syllable_pattern = re.compile(r'[\uac00-\ud7af]')
+
+    @property
+    def g2p_en(self):
+        return _get_g2p()
 
     def estimate_duration(self, text: str, lang: str | None = None) -> float:
         syllable_count = self.count_syllables(text, lang)
@@ -24,43 +67,35 @@ class AdvancedSyllableEstimator:
         if not text.strip(): return 0
         lang = lang or self._detect_language(text)
         
-        vowels_map = {
-            'fr': 'aeiouyàâéèêëîïôùûüÿœæ',
-            'es': 'aeiouáéíóúü'
-        }
-        
         if lang == 'en':
             return self._count_english_syllables(text)
         elif lang == 'zh':
-            text = re.sub(r'[^\u4e00-\u9fff]', '', text)
+            from pypinyin import pinyin, Style
+            text = self.non_hanzi_pattern.sub('', text)
             return len(pinyin(text, style=Style.NORMAL))
         elif lang == 'ja':
-            text = re.sub(r'[きぎしじちぢにひびぴみり][ょゅゃ]', 'X', text)
-            text = re.sub(r'[っー]', '', text)
-            return len(re.findall(r'[\u3040-\u309f\u30a0-\u30ff\u4e00-\u9fff]', text))
+            text = self.ja_youon_pattern.sub('X', text)
+            text = self.ja_skip_pattern.sub('', text)
+            return len(self.ja_mora_pattern.findall(text))
         elif lang in ('fr', 'es'):
-            text = re.sub(r'e\b', '', text.lower()) if lang == 'fr' else text.lower()
-            return max(1, len(re.findall(f'[{vowels_map[lang]}]+', text)))
+            text = self.fr_silent_e_pattern.sub('', text.lower()) if lang == 'fr' else text.lower()
+            return max(1, len(self.vowel_patterns[lang].findall(text)))
         elif lang == 'ko':
-            return len(re.findall(r'[\uac00-\ud7af]', text))
+            return len(self.ko_syllable_pattern.findall(text))
         return len(text.split())
 
     def _count_english_syllables(self, text: str) -> int:
-        total = 0
-        for word in text.strip().split():
-            try:
-                total += syllables.estimate(word)
-            except:
-                phones = self.g2p_en(word)
-                total += max(1, len([p for p in phones if any(c in p for c in 'aeiou')]))
+        total = sum(english_word_syllables(word) for word in text.strip().split())
         return max(1, total)
 
     def _detect_language(self, text: str) -> str:
         for lang, pattern in self.lang_patterns.items():
-            if re.search(pattern, text): return lang
+            if pattern.search(text): return lang
         return 'en'
 
-    def process_mixed_text(self, text: str) -> dict:
+    def process_mixed_text(self, text: str, rates: dict | None = None) -> dict:
+        """Break text down by language; `rates` overrides seconds per syllable for some languages"""
+        rates = {**self.duration_params, **rates} if rates else self.duration_params
         if not text or not isinstance(text, str):
             return {
                 'language_breakdown': {},
@@ -71,23 +106,29 @@ class AdvancedSyllableEstimator:
             }
             
         result = {'language_breakdown': {}, 'total_syllables': 0, 'punctuation': [], 'spaces': []}
-        segments = re.split(f"({self.punctuation['space']}|{self.punctuation['mid']}|{self.punctuation['end']})", text)
+        segments = self.segment_pattern.split(text)
         total_duration = 0
+        # Detect each segment's language at most once, even when it neighbours a space
+        langs = {}
+        def lang_of(i):
+            if i not in langs:
+                langs[i] = self._detect_language(segments[i])
+            return langs[i]
         
         for i, segment in enumerate(segments):
             if not segment: continue
             
-            if re.match(self.punctuation['space'], segment):
-                prev_lang = self._detect_language(segments[i-1]) if i > 0 else None
-                next_lang = self._detect_language(segments[i+1]) if i < len(segments)-1 else None
+            if self.space_pattern.match(segment):
+                prev_lang = lang_of(i-1) if i > 0 else None
+                next_lang = lang_of(i+1) if i < len(segments)-1 else None
                 if prev_lang and next_lang and (self.lang_joiners[prev_lang] == '' or self.lang_joiners[next_lang] == ''):
                     result['spaces'].append(segment)
                     total_duration += self.punctuation['pause']['space']
-            elif re.match(f"{self.punctuation['mid']}|{self.punctuation['end']}", segment):
+            elif self.punct_pattern.match(segment):
                 result['punctuation'].append(segment)
                 total_duration += self.punctuation['pause']['default']
             else:
-                lang = self._detect_language(segment)
+                lang = lang_of(i)
                 if lang:
                     syllables = self.count_syllables(segment, lang)
                     if lang not in result['language_breakdown']:
@@ -96,23 +137,48 @@ class AdvancedSyllableEstimator:
                     result['language_breakdown'][lang]['text'] += (self.lang_joiners[lang] + segment 
                         if result['language_breakdown'][lang]['text'] else segment)
                     result['total_syllables'] += syllables
-                    total_duration += syllables * self.duration_params.get(lang, self.duration_params['default'])
+                    total_duration += syllables * rates.get(lang, rates['default'])
         
         result['estimated_duration'] = total_duration
         
         return result
+
+    def estimate_many(self, texts, rates: dict | None = None) -> list:
+        """Estimated durations for many texts; repeated texts are only measured once"""
+        cache = {}
+        durations = []
+        for text in texts:
+            if not text or not isinstance(text, str):
+                durations.append(0)
+                continue
+            if text not in cache:
+                cache[text] = self.process_mixed_text(text, rates)['estimated_duration']
+            durations.append(cache[text])
+        return durations
     
 def init_estimator():
     return AdvancedSyllableEstimator()
 
-def estimate_duration(text: str, estimator: AdvancedSyllableEstimator):
+_estimator = None
+_estimator_lock = threading.Lock()
+
+def get_estimator() -> AdvancedSyllableEstimator:
+    """Process-wide estimator, created on first use and shared by all stages"""
+    global _estimator
+    if _estimator is None:
+        with _estimator_lock:
+            if _estimator is None:
+                _estimator = init_estimator()
+    return _estimator
+
+def estimate_duration(text: str, estimator: AdvancedSyllableEstimator, rates: dict | None = None):
     if not text or not isinstance(text, str):
         return 0
-    return estimator.process_mixed_text(text)['estimated_duration']
+    return estimator.process_mixed_text(text, rates)['estimated_duration']
 
 # 使用示例
 if __name__ == "__main__":
-    estimator = init_estimator()
+    estimator = get_estimator()
     print(estimate_duration('你好', estimator))
 
     # 测试用例
@@ -1,20 +1,26 @@
-from openai import OpenAI
+import io
+import struct
+import threading
+import wave
+from collections import namedtuple
 from pathlib import Path
+
+from openai import OpenAI
+from core.tts_backend.base import TTSBackend, SynthesisResult
 from core.utils.config_utils import load_key
 from core.utils.decorator import except_handler
-from core.constants import DEFAULT_OPENAI_TTS_VOICE, DEFAULT_OPENAI_TTS_MODEL, DEFAULT_OPENAI_TTS_BASE_URL
+from core.constants import DEFAULT_OPENAI_TTS_VOICE, DEFAULT_OPENAI_TTS_MODEL, DEFAULT_OPENAI_TTS_BASE_URL, OPENAI_TTS_VOICE_OPTIONS
 from rich import print as rprint
 
+OPENAI_TTS_CHUNK_SIZE = 64 * 1024
 
-@except_handler("Failed to generate audio using OpenAI TTS")
-def openai_tts_for_videolingo(text, save_as):
-    """
-    Generate speech using OpenAI Text-to-Speech API (gpt-4o-mini-tts)
-    """
-    # Get API configuration from config, fall back to main API config if not set
+WavFormat = namedtuple('WavFormat', ['nchannels', 'sampwidth', 'framerate'])
+
+
+def resolve_openai_tts_settings() -> tuple[str, str]:
+    """(api_key, base_url) for TTS, falling back to the main API config if not set"""
     api_key = load_key("openai_tts.api_key") or load_key("api.key")
     base_url = load_key("openai_tts.base_url") or load_key("api.base_url")
-    voice = load_key("openai_tts.voice") or DEFAULT_OPENAI_TTS_VOICE
 
     if not api_key:
         raise ValueError("OpenAI API key is not set. Please set either openai_tts.api_key or api.key in the Streamlit settings page")
@@ -24,20 +30,112 @@ def openai_tts_for_videolingo(text, save_as):
         base_url = DEFAULT_OPENAI_TTS_BASE_URL
     elif 'v1' not in base_url:
         base_url = base_url.strip('/') + '/v1'
+    return api_key, base_url
+
+
+def read_wav_bytes(data: bytes) -> tuple:
+    """(format, frames) of an in-memory WAV, sized from the received data rather than the header"""
+    # Streamed WAVs carry placeholder sizes (0 or 0xFFFFFFFF) in the RIFF and data
+    # headers, so walk the chunks by hand and take every byte after the data header
+    if data[:4] != b'RIFF' or data[8:12] != b'WAVE':
+        raise ValueError("TTS response is not a WAV file")
+    wav_format = None
+    offset = 12
+    while offset + 8 <= len(data):
+        chunk_id = data[offset:offset + 4]
+        chunk_size = struct.unpack('<I', data[offset + 4:offset + 8])[0]
+        body = offset + 8
+        if chunk_id == b'fmt ':
+            channels, framerate = struct.unpack('<HI', data[body + 2:body + 8])
+            bits = struct.unpack('<H', data[body + 14:body + 16])[0]
+            wav_format = WavFormat(channels, bits // 8, framerate)
+        elif chunk_id == b'data':
+            if wav_format is None:
+                break
+            frames = data[body:]
+            frame_size = wav_format.sampwidth * wav_format.nchannels
+            return wav_format, frames[:len(frames) - len(frames) % frame_size]
+        offset = body + chunk_size + (chunk_size & 1)
+    raise ValueError("WAV response has no fmt chunk before its data chunk")
+
 
-    client = OpenAI(api_key=api_key, base_url=base_url)
+def write_wav(save_path, params, frames: bytes) -> None:
+    with wave.open(str(save_path), 'wb') as wav_file:
+        wav_file.setnchannels(params.nchannels)
+        wav_file.setsampwidth(params.sampwidth)
+        wav_file.setframerate(params.framerate)
+        wav_file.writeframes(frames)
 
-    save_path = Path(save_as)
-    save_path.parent.mkdir(parents=True, exist_ok=True)
 
-    # Use gpt-4o-mini-tts with audio.speech.create
-    with client.audio.speech.with_streaming_response.create(
-        model="gpt-4o-mini-tts",
-        voice=voice,
-        input=text,
-        response_format="wav"
-    ) as response:
-        response.stream_to_file(save_path)
+class OpenAITTSBackend(TTSBackend):
+    """
+    OpenAI Text-to-Speech (gpt-4o-mini-tts) with one client shared by all lines.
+
+    Speech is streamed as WAV into memory and its format is read from the header, so
+    any OpenAI-compatible server works; the duration is returned so callers can skip
+    decoding the saved file again.
+    """
+
+    def __init__(self, api_key: str, base_url: str, model: str = DEFAULT_OPENAI_TTS_MODEL):
+        # The client keeps a pooled HTTP connection, reused across threads
+        self.client = OpenAI(api_key=api_key, base_url=base_url)
+        self.model = model
 
-    rprint(f"音频已成功保存至: {save_path}")
-    return True
+    def synthesize(self, text, output_path, number=None, task_df=None) -> SynthesisResult:
+        voice = load_key("openai_tts.voice") or DEFAULT_OPENAI_TTS_VOICE
+        save_path = Path(output_path)
+        save_path.parent.mkdir(parents=True, exist_ok=True)
+
+        buffer = io.BytesIO()
+        with self.client.audio.speech.with_streaming_response.create(
+            model=self.model,
+            voice=voice,
+            input=text,
+            response_format="wav"
+        ) as response:
+            for chunk in response.iter_bytes(OPENAI_TTS_CHUNK_SIZE):
+                buffer.write(chunk)
+
+        params, frames = read_wav_bytes(buffer.getvalue())
+        # Rewrite with a header that matches the frames actually received
+        write_wav(save_path, params, frames)
+        num_frames = len(frames) // (params.sampwidth * params.nchannels)
+        return SynthesisResult(duration=num_frames / params.framerate)
+
+    @property
+    def name(self) -> str:
+        return "openai_tts"
+
+    @property
+    def supports_ssml(self) -> bool:
+        return False
+
+    @property
+    def available_voices(self) -> list:
+        return list(OPENAI_TTS_VOICE_OPTIONS)
+
+
+_backend = None
+_backend_settings = None
+_backend_lock = threading.Lock()
+
+
+def get_openai_tts_backend() -> OpenAITTSBackend:
+    """The shared OpenAI TTS backend, rebuilt only when the API key or base URL changes"""
+    global _backend, _backend_settings
+    settings = resolve_openai_tts_settings()
+    with _backend_lock:
+        if _backend is None or _backend_settings != settings:
+            _backend = OpenAITTSBackend(*settings)
+            _backend_settings = settings
+        return _backend
+
+
+@except_handler("Failed to generate audio using OpenAI TTS")
+def openai_tts_for_videolingo(text, save_as) -> SynthesisResult:
+    """
+    Generate speech using OpenAI Text-to-Speech API (gpt-4o-mini-tts)
+    """
+    result = get_openai_tts_backend().synthesize(text, save_as)
+    rprint(f"音频已成功保存至: {save_as}")
+    return result
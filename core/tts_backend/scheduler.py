@@ -0,0 +1,110 @@
+"""
+TTS Scheduler
+
+Flattens dubbing tasks into one unit per subtitle line and synthesizes them
+concurrently, bounded by per-backend concurrency and request-rate limits.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from core.tts_backend.tts_main import tts_main
+from core.utils import rprint, load_key
+
+# Most concurrent requests and requests per second each backend tolerates; the
+# user's max_workers still caps concurrency, and unlisted backends have no rate limit
+BACKEND_LIMITS = {
+    'edge_tts': {'concurrency': 8, 'rate': 10.0},
+    'openai_tts': {'concurrency': 4, 'rate': 5.0},
+}
+
+
+@dataclass(frozen=True)
+class TTSUnit:
+    """One subtitle line to synthesize, with only the fields the worker needs"""
+    number: int
+    line_index: int
+    text: str
+    save_as: str
+
+
+@dataclass(frozen=True)
+class TTSUnitResult:
+    number: int
+    line_index: int
+    text: str
+    duration: float
+    latency: float
+    synthesized: bool  # real speech generated in this run, not silence or a cached file
+
+
+class RateLimiter:
+    """Spaces out request starts so at most `rate` begin per second (no limit when rate is falsy)"""
+
+    def __init__(self, rate: Optional[float]):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+class TTSScheduler:
+    """Runs TTS units concurrently within the limits of one backend"""
+
+    def __init__(self, tts_method: Optional[str] = None, concurrency: Optional[int] = None, rate: Optional[float] = None):
+        self.tts_method = tts_method or load_key("tts_method")
+        limits = BACKEND_LIMITS.get(self.tts_method, {})
+        max_workers = load_key("max_workers")
+        self.concurrency = concurrency or min(max_workers, limits.get('concurrency', max_workers))
+        self.limiter = RateLimiter(rate if rate is not None else limits.get('rate'))
+
+    def _synthesize(self, unit: TTSUnit) -> TTSUnitResult:
+        self.limiter.acquire()
+        start = time.monotonic()
+        result = tts_main(unit.text, unit.save_as, unit.number, None)
+        return TTSUnitResult(unit.number, unit.line_index, unit.text, result.duration,
+                             time.monotonic() - start, result.synthesized)
+
+    def run(self, units: list[TTSUnit], on_done: Optional[Callable[[TTSUnitResult], None]] = None) -> list[TTSUnitResult]:
+        """Synthesize all units; results come back in input order, `on_done` fires as each finishes"""
+        results = [None] * len(units)
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            futures = {executor.submit(self._synthesize, unit): i for i, unit in enumerate(units)}
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    unit = units[futures[future]]
+                    rprint(f"[red]❌ TTS failed for line {unit.number}_{unit.line_index}: {str(e)}[/red]")
+                    for pending in futures:
+                        pending.cancel()
+                    raise
+                results[futures[future]] = result
+                if on_done:
+                    on_done(result)
+        self.report(results)
+        return results
+
+    def report(self, results: list[TTSUnitResult]) -> None:
+        """Print per-unit latency statistics"""
+        latencies = sorted(result.latency for result in results)
+        if not latencies:
+            return
+        def percentile(p):
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+        rprint(
+            f"[cyan]⏱️ {self.tts_method}: {len(latencies)} line(s), concurrency {self.concurrency}, "
+            f"latency mean {sum(latencies) / len(latencies):.2f}s, p50 {percentile(0.5):.2f}s, "
+            f"p95 {percentile(0.95):.2f}s, max {latencies[-1]:.2f}s[/cyan]"
+        )
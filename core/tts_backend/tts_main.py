@@ -5,6 +5,7 @@ import wave
 from pydub import AudioSegment
 
 from core.asr_backend.audio_preprocess import get_audio_duration
+from core.tts_backend.base import SynthesisResult
 from core.tts_backend.edge_tts import edge_tts
 from core.tts_backend.openai_tts import openai_tts_for_videolingo
 from core.prompts import get_correct_text_prompt
@@ -31,20 +32,24 @@ def clean_text_for_tts(text):
     return text.strip()
 
 
-def tts_main(text, save_as, number, task_df):
+SILENT_DURATION_MS = 100
+
+
+def tts_main(text, save_as, number, task_df) -> SynthesisResult:
+    """Synthesize one line to save_as; the result says whether real speech was generated"""
     text = clean_text_for_tts(text)
     # Check if text is empty or single character, single character voiceovers are prone to bugs
     cleaned_text = re.sub(r'[^\w\s]', '', text).strip()
     if not cleaned_text or len(cleaned_text) <= 1:
         # Create valid silent WAV file
         os.makedirs(os.path.dirname(save_as), exist_ok=True)
-        create_silent_wav(save_as, duration_ms=100)
+        create_silent_wav(save_as, duration_ms=SILENT_DURATION_MS)
         rprint(f"Created silent audio for empty/single-char text: {save_as}")
-        return
+        return SynthesisResult(SILENT_DURATION_MS / 1000, synthesized=False)
     
     # Skip if file exists
     if os.path.exists(save_as):
-        return
+        return SynthesisResult(get_audio_duration(save_as), synthesized=False)
     
     print(f"Generating <{text}...>")
     TTS_METHOD = load_key("tts_method")
@@ -56,15 +61,16 @@ def tts_main(text, save_as, number, task_df):
                 print("Asking GPT to correct text...")
                 correct_text = ask_gpt(get_correct_text_prompt(text),resp_type="json", log_title='tts_correct_text')
                 text = correct_text['text']
+            result = None
             if TTS_METHOD == 'edge_tts':
                 edge_tts(text, save_as)
             elif TTS_METHOD == 'openai_tts':
-                openai_tts_for_videolingo(text, save_as)
+                result = openai_tts_for_videolingo(text, save_as)
 
-            # Check generated audio duration
-            duration = get_audio_duration(save_as)
+            # Check generated audio duration, decoding the file only if the backend did not report it
+            duration = result.duration if result is not None else get_audio_duration(save_as)
             if duration > 0:
-                break
+                return SynthesisResult(duration)
             else:
                 if os.path.exists(save_as):
                     os.remove(save_as)
@@ -72,8 +78,8 @@ def tts_main(text, save_as, number, task_df):
                     print(f"Warning: Generated audio duration is 0 for text: {text}")
                     # Create silent audio file
                     os.makedirs(os.path.dirname(save_as), exist_ok=True)
-                    create_silent_wav(save_as, duration_ms=100)
-                    return
+                    create_silent_wav(save_as, duration_ms=SILENT_DURATION_MS)
+                    return SynthesisResult(SILENT_DURATION_MS / 1000, synthesized=False)
                 print(f"Attempt {attempt + 1} failed, retrying...")
         except Exception as e:
             if attempt == max_retries - 1:
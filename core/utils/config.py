@@ -1,12 +1,16 @@
 import json
 import os
 import threading
+from types import MappingProxyType
 
 lock = threading.Lock()
 
 # Runtime config for worker threads (set before pipeline starts)
 RUNTIME_CONFIG = {}
 
+# Read-only view of the fully resolved config, taken when a job starts (see freeze_config)
+_config_snapshot = None
+
 # -----------------------
 # Import constants
 # -----------------------
@@ -19,7 +23,9 @@ from core.constants import (
     DEFAULT_API_LLM_SUPPORT_JSON,
     DEFAULT_MAX_WORKERS,
     DEFAULT_SUMMARY_LENGTH,
+    DEFAULT_SUMMARY_TOKEN_BUDGET,
     DEFAULT_REFLECT_TRANSLATE,
+    DEFAULT_REFLECT_MODE,
     DEFAULT_PAUSE_BEFORE_TRANSLATE,
     DEFAULT_ASR_LANGUAGE,
     DEFAULT_ASR_DETECTED_LANGUAGE,
@@ -75,7 +81,9 @@ DEFAULT_CONFIG = {
     # LLM Processing
     "max_workers": DEFAULT_MAX_WORKERS,
     "summary_length": DEFAULT_SUMMARY_LENGTH,
+    "summary_token_budget": DEFAULT_SUMMARY_TOKEN_BUDGET,
     "reflect_translate": DEFAULT_REFLECT_TRANSLATE,
+    "reflect_mode": DEFAULT_REFLECT_MODE,
     "pause_before_translate": DEFAULT_PAUSE_BEFORE_TRANSLATE,
 
     # ASR (cloud services only)
@@ -150,8 +158,13 @@ def _load_config_from_file_pure():
 
 
 def load_key(key):
-    """Load config value from RUNTIME_CONFIG, config file, or DEFAULT_CONFIG (no Streamlit)"""
-    # First try RUNTIME_CONFIG (for worker threads or explicit overrides)
+    """Load config value from the frozen snapshot, RUNTIME_CONFIG, config file, or DEFAULT_CONFIG (no Streamlit)"""
+    # A frozen snapshot answers every key with a single dict lookup
+    snapshot = _config_snapshot
+    if snapshot is not None and key in snapshot:
+        return snapshot[key]
+
+    # Then try RUNTIME_CONFIG (for worker threads or explicit overrides)
     if key in RUNTIME_CONFIG and RUNTIME_CONFIG[key] is not None:
         return RUNTIME_CONFIG[key]
 
@@ -168,12 +181,60 @@ def set_runtime_key(key, value):
     """Set a value in RUNTIME_CONFIG (for worker threads or temporary overrides)"""
     with lock:
         RUNTIME_CONFIG[key] = value
+    update_config_snapshot(key, value)
 
 
 def clear_runtime_config():
     """Clear all runtime config values"""
     with lock:
         RUNTIME_CONFIG.clear()
+    invalidate_config_snapshot()
+
+
+# -----------------------
+# Frozen config snapshot
+# -----------------------
+
+def freeze_config(overrides=None):
+    """
+    Resolve every config key once and publish the result as an immutable snapshot.
+
+    Call this when a job starts (optionally with the Streamlit session config as
+    overrides); from then on load_key in any thread is a single dict lookup.
+    """
+    global _config_snapshot
+    with lock:
+        values = dict(DEFAULT_CONFIG)
+        for layer in (_load_config_from_file_pure(), RUNTIME_CONFIG, overrides):
+            if layer:
+                values.update({k: v for k, v in layer.items() if v is not None})
+        _config_snapshot = MappingProxyType(values)
+    return _config_snapshot
+
+
+def get_config_snapshot():
+    """Return the active frozen snapshot, or None when config is resolved lazily"""
+    return _config_snapshot
+
+
+def update_config_snapshot(key, value):
+    """Publish a new snapshot with one key changed; no-op when nothing is frozen or unchanged"""
+    global _config_snapshot
+    with lock:
+        snapshot = _config_snapshot
+        if snapshot is None or value is None or snapshot.get(key) == value:
+            return False
+        values = dict(snapshot)
+        values[key] = value
+        _config_snapshot = MappingProxyType(values)
+    return True
+
+
+def invalidate_config_snapshot():
+    """Drop the frozen snapshot so lookups fall back to the live config layers"""
+    global _config_snapshot
+    with lock:
+        _config_snapshot = None
 
 
 # basic utils
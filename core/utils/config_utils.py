@@ -14,6 +14,10 @@ from core.utils.config import (
     load_key as load_key_pure,
     set_runtime_key,
     clear_runtime_config,
+    freeze_config,
+    get_config_snapshot,
+    update_config_snapshot,
+    invalidate_config_snapshot,
     get_joiner,
     _load_config_from_file_pure,
 )
@@ -48,8 +52,13 @@ def _set_nested_value(data, keys, new_value):
 
 
 def load_key(key):
-    """Load config value from RUNTIME_CONFIG, session_state, or DEFAULT_CONFIG"""
-    # First try RUNTIME_CONFIG (for worker threads)
+    """Load config value from the frozen snapshot, RUNTIME_CONFIG, session_state, or DEFAULT_CONFIG"""
+    # A job in progress reads its frozen snapshot (safe from worker threads)
+    snapshot = get_config_snapshot()
+    if snapshot is not None and key in snapshot:
+        return snapshot[key]
+
+    # Then try RUNTIME_CONFIG (for worker threads)
     if key in RUNTIME_CONFIG and RUNTIME_CONFIG[key] is not None:
         return RUNTIME_CONFIG[key]
 
@@ -67,7 +76,8 @@ def load_key(key):
 
 
 def update_key(key, value):
-    """Update config value in session_state"""
+    """Update config value in session_state and in the frozen snapshot, if any"""
+    snapshot_updated = update_config_snapshot(key, value)
     if hasattr(st, 'session_state') and st.session_state:
         if "config" not in st.session_state:
             st.session_state.config = DEFAULT_CONFIG.copy()
@@ -75,7 +85,7 @@ def update_key(key, value):
         # Use key directly (flat key structure, not nested)
         st.session_state.config[key] = value
         return True
-    return False
+    return snapshot_updated
 
 
 # Save/Load config to/from file
@@ -100,6 +110,7 @@ def load_config_from_file():
         merged_config = DEFAULT_CONFIG.copy()
         merged_config.update(imported_config)
         st.session_state.config = merged_config
+        invalidate_config_snapshot()
         return True, config_path
     except FileNotFoundError:
         return False, f"File not found: {config_path}"
@@ -0,0 +1,73 @@
+"""
+Per-job snapshot of resolved settings.
+
+Hot loops (tokenizing, splitting, aligning) used to call load_key and get_joiner
+for every sentence. A JobContext resolves those values once when a job starts and
+is then passed to (or fetched by) the stages, so worker threads never touch the
+config layer in tight loops.
+"""
+import threading
+from dataclasses import dataclass
+from typing import Optional
+from core.utils.config_utils import load_key, get_joiner, get_config_snapshot
+
+
+@dataclass(frozen=True)
+class JobContext:
+    # Languages
+    src_language: str
+    joiner: Optional[str]  # None when the source language has no known joiner
+
+    # LLM processing
+    max_workers: int
+    max_split_length: int
+
+    # Subtitle
+    subtitle_max_length: int
+    subtitle_target_multiplier: float
+    min_trim_duration: float
+
+    def require_joiner(self) -> str:
+        """Return the source language joiner, raising if the language is unsupported"""
+        if self.joiner is None:
+            raise ValueError(f"Unsupported language code: {self.src_language}")
+        return self.joiner
+
+
+def build_job_context() -> JobContext:
+    """Resolve all settings a job needs from the config layer"""
+    asr_language = load_key("asr.language")
+    src_language = load_key("asr.detected_language") if asr_language == 'auto' else asr_language
+    try:
+        joiner = get_joiner(src_language)
+    except ValueError:
+        joiner = None
+
+    return JobContext(
+        src_language=src_language,
+        joiner=joiner,
+        max_workers=load_key("max_workers"),
+        max_split_length=load_key("max_split_length"),
+        subtitle_max_length=load_key("subtitle.max_length"),
+        subtitle_target_multiplier=load_key("subtitle.target_multiplier"),
+        min_trim_duration=load_key("min_trim_duration"),
+    )
+
+
+_job_context: Optional[JobContext] = None
+_job_context_snapshot = None  # config snapshot the context was built from
+_job_context_lock = threading.Lock()
+
+
+def get_job_context() -> JobContext:
+    """Get the current job context, resolving it again whenever the config snapshot changes"""
+    global _job_context, _job_context_snapshot
+    snapshot = get_config_snapshot()
+    context = _job_context
+    if context is None or _job_context_snapshot is not snapshot:
+        with _job_context_lock:
+            if _job_context is None or _job_context_snapshot is not snapshot:
+                _job_context = build_job_context()
+                _job_context_snapshot = snapshot
+            context = _job_context
+    return context
@@ -7,6 +7,7 @@ from core.paths import (
     _3_2_SPLIT_BY_MEANING,
     _4_1_TERMINOLOGY,
     _4_2_TRANSLATION,
+    _4_2_TRANSLATION_JOURNAL,
     _5_SPLIT_SUB,
     _5_REMERGED,
     _8_1_AUDIO_TASK,
@@ -30,6 +31,7 @@ __all__ = [
     "_3_2_SPLIT_BY_MEANING",
     "_4_1_TERMINOLOGY",
     "_4_2_TRANSLATION",
+    "_4_2_TRANSLATION_JOURNAL",
     "_5_SPLIT_SUB",
     "_5_REMERGED",
     "_8_1_AUDIO_TASK",
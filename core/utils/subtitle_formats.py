@@ -0,0 +1,164 @@
+"""
+Subtitle format engine.
+
+Every writer renders the same cue table: a DataFrame with float `start`/`end`
+columns (seconds) plus one column per text track (e.g. `Source`, `Translation`).
+A subtitle output config is a `(filename, columns)` pair; the file extension picks
+the writer, so SRT, WebVTT, ASS and JSON outputs are all produced from one table.
+"""
+import json
+import os
+import numpy as np
+
+# ------------
+# ASS styling
+# ------------
+
+# Same canvas libass uses when it renders SRT, so font sizes match the old force_style burns
+ASS_PLAY_RES_X = 384
+ASS_PLAY_RES_Y = 288
+ASS_FONT_NAME = "Arial"
+ASS_MARGIN_V = 10
+# Extra bottom margin per stacked track, so the second layer sits above the first
+ASS_LINE_SPACING = 20
+
+# Per-track style: (font size, primary colour in &HAABBGGRR)
+ASS_TRACK_STYLES = {
+    'Source': (15, "&H00FFFFFF"),
+    'Translation': (17, "&H0000FFFF"),
+}
+ASS_DEFAULT_STYLE = (15, "&H00FFFFFF")
+
+SUBTITLE_EXTENSIONS = ('.srt', '.vtt', '.ass')
+
+
+def _split_times(seconds):
+    """Split an array of seconds into integer hours, minutes, seconds and milliseconds"""
+    seconds = np.asarray(seconds, dtype=float)
+    hours = (seconds // 3600).astype(int)
+    minutes = ((seconds % 3600) // 60).astype(int)
+    secs = seconds % 60
+    millis = (secs * 1000).astype(int) % 1000
+    return hours, minutes, secs.astype(int), millis
+
+
+def format_srt_times(seconds):
+    """Format an array of times (in seconds) as SRT `HH:MM:SS,mmm` strings in bulk"""
+    return [f"{h:02d}:{m:02d}:{s:02d},{ms:03d}" for h, m, s, ms in zip(*_split_times(seconds))]
+
+
+def format_vtt_times(seconds):
+    """Format an array of times (in seconds) as WebVTT `HH:MM:SS.mmm` strings in bulk"""
+    return [f"{h:02d}:{m:02d}:{s:02d}.{ms:03d}" for h, m, s, ms in zip(*_split_times(seconds))]
+
+
+def format_ass_times(seconds):
+    """Format an array of times (in seconds) as ASS `H:MM:SS.cc` strings in bulk"""
+    return [f"{h:d}:{m:02d}:{s:02d}.{ms // 10:02d}" for h, m, s, ms in zip(*_split_times(seconds))]
+
+
+def _track_texts(cues, columns):
+    return {col: [str(x).strip() for x in cues[col]] for col in set(columns)}
+
+
+# ------------
+# Writers
+# ------------
+
+def render_srt(cues, columns):
+    """Render cues as SRT; up to two tracks, one line each"""
+    if 'timestamp' in cues:
+        timestamps = cues['timestamp']
+    else:
+        timestamps = [f"{s} --> {e}" for s, e in zip(format_srt_times(cues['start']), format_srt_times(cues['end']))]
+    texts = _track_texts(cues, columns)
+    first = texts[columns[0]]
+    second = texts[columns[1]] if len(columns) > 1 else [''] * len(first)
+    return ''.join(f"{i+1}\n{ts}\n{a}\n{b}\n\n" for i, (ts, a, b) in enumerate(zip(timestamps, first, second))).strip()
+
+
+def render_vtt(cues, columns):
+    """Render cues as WebVTT, one line per track"""
+    texts = _track_texts(cues, columns)
+    blocks = ["WEBVTT"]
+    for i, (start, end) in enumerate(zip(format_vtt_times(cues['start']), format_vtt_times(cues['end']))):
+        lines = '\n'.join(texts[col][i] for col in columns if texts[col][i])
+        blocks.append(f"{i+1}\n{start} --> {end}\n{lines}")
+    return '\n\n'.join(blocks) + '\n'
+
+
+def _ass_escape(text):
+    return text.replace('\n', '\\N').replace('{', '(').replace('}', ')')
+
+
+def render_ass(cues, columns):
+    """Render cues as a pre-styled ASS script with one layer (and one style) per track"""
+    styles = []
+    for layer, col in enumerate(columns):
+        size, colour = ASS_TRACK_STYLES.get(col, ASS_DEFAULT_STYLE)
+        margin_v = ASS_MARGIN_V + layer * ASS_LINE_SPACING
+        styles.append(
+            f"Style: {col},{ASS_FONT_NAME},{size},{colour},&H000000FF,&H00000000,&H00000000,"
+            f"0,0,0,0,100,100,0,0,1,1,0,2,10,10,{margin_v},1"
+        )
+    header = '\n'.join([
+        "[Script Info]",
+        "ScriptType: v4.00+",
+        f"PlayResX: {ASS_PLAY_RES_X}",
+        f"PlayResY: {ASS_PLAY_RES_Y}",
+        "WrapStyle: 0",
+        "ScaledBorderAndShadow: yes",
+        "",
+        "[V4+ Styles]",
+        "Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, "
+        "Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, "
+        "Alignment, MarginL, MarginR, MarginV, Encoding",
+        *styles,
+        "",
+        "[Events]",
+        "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text",
+    ])
+
+    texts = _track_texts(cues, columns)
+    starts, ends = format_ass_times(cues['start']), format_ass_times(cues['end'])
+    events = [
+        f"Dialogue: {layer},{starts[i]},{ends[i]},{col},,0,0,0,,{_ass_escape(texts[col][i])}"
+        for i in range(len(starts))
+        for layer, col in enumerate(columns)
+        if texts[col][i]
+    ]
+    return header + '\n' + '\n'.join(events) + '\n'
+
+
+def render_json(cues, columns):
+    """Render cues as a JSON list with float times and one key per track"""
+    texts = _track_texts(cues, columns)
+    records = [
+        {"index": i + 1, "start": float(start), "end": float(end), **{col.lower(): texts[col][i] for col in columns}}
+        for i, (start, end) in enumerate(zip(cues['start'], cues['end']))
+    ]
+    return json.dumps(records, ensure_ascii=False, indent=2)
+
+
+WRITERS = {
+    '.srt': render_srt,
+    '.vtt': render_vtt,
+    '.ass': render_ass,
+    '.json': render_json,
+}
+
+
+def render_subtitles(cues, filename, columns):
+    """Render cues in the format given by the filename extension"""
+    ext = os.path.splitext(filename)[1].lower()
+    if ext not in WRITERS:
+        raise ValueError(f"Unsupported subtitle format: {filename}")
+    return WRITERS[ext](cues, columns)
+
+
+def write_subtitles(cues, subtitle_output_configs, output_dir):
+    """Write every (filename, columns) config in subtitle_output_configs to output_dir"""
+    os.makedirs(output_dir, exist_ok=True)
+    for filename, columns in subtitle_output_configs:
+        with open(os.path.join(output_dir, filename), 'w', encoding='utf-8') as f:
+            f.write(render_subtitles(cues, filename, columns))
@@ -1,6 +1,7 @@
 import pandas as pd
-import os
+import numpy as np
 import re
+from core.utils.subtitle_formats import format_srt_times, write_subtitles
 
 
 def convert_to_srt_format(start_time, end_time):
@@ -38,92 +39,200 @@ def show_difference(str1, str2):
     print("Difference positions:")
     print(f"Expected sentence: {str1}")
     print(f"Actual match: {str2}")
-    print("Position markers: " + "".join("^" if i in diff_positions else " " for i in range(max(len(str1), len(str2)))))
+    diff_set = set(diff_positions)
+    print("Position markers: " + "".join("^" if i in diff_set else " " for i in range(max(len(str1), len(str2)))))
     print(f"Difference indices: {diff_positions}")
 
 
-def get_sentence_timestamps(df_words, df_sentences):
+class WordIndex:
+    """
+    Normalized transcript words joined into one string, with position -> word lookup.
+
+    `ends[i]` is the exclusive end offset of word i in `text`, so the word covering a
+    character position is found by binary search instead of a per-character dict.
+    """
+
+    def __init__(self, words):
+        clean_words = [remove_punctuation(str(word).lower()) for word in words]
+        self.text = ''.join(clean_words)
+        self.ends = np.cumsum([len(word) for word in clean_words])
+
+    def word_at(self, pos):
+        """Index of the word containing character `pos` (empty words are skipped)"""
+        idx = int(np.searchsorted(self.ends, pos, side='right'))
+        return min(idx, len(self.ends) - 1)
+
+    def find(self, sentence, start=0):
+        """Character span (begin, end) of the next occurrence of `sentence`, or None"""
+        begin = self.text.find(sentence, start)
+        if begin == -1:
+            return None
+        return begin, begin + len(sentence)
+
+
+# Fuzzy alignment tuning: sentences whose exact text is not found (e.g. the LLM
+# rewrote a few words) are aligned with a banded Needleman-Wunsch instead
+ALIGN_BAND_RATIO = 0.3  # band half-width relative to the sentence length
+ALIGN_MIN_BAND = 10
+ALIGN_MATCH_SCORE = 2
+ALIGN_MISMATCH_SCORE = -1
+ALIGN_GAP_SCORE = -1
+# Below this confidence the aligned span is not trusted and times are interpolated
+MIN_ALIGN_CONFIDENCE = 0.6
+
+
+def banded_align(sentence, text, band):
+    """
+    Align `sentence` against a prefix region of `text` within a diagonal band.
+
+    The sentence must be consumed entirely, while leading and trailing characters
+    of `text` are free (semi-global). Returns (begin, end, matches) of the best
+    span in `text`.
+    """
+    n, m = len(sentence), len(text)
+    neg = float('-inf')
+    # Row 0: the span may start anywhere within the band for free
+    prev_score = [0 if j <= band else neg for j in range(m + 1)]
+    prev_begin = list(range(m + 1))
+    prev_match = [0] * (m + 1)
+
+    for i in range(1, n + 1):
+        score = [neg] * (m + 1)
+        begin = [0] * (m + 1)
+        match = [0] * (m + 1)
+        lo, hi = max(0, i - band), min(m, i + band)
+        if lo == 0:
+            score[0] = prev_score[0] + ALIGN_GAP_SCORE
+            begin[0], match[0] = prev_begin[0], prev_match[0]
+        char = sentence[i - 1]
+        for j in range(max(1, lo), hi + 1):
+            same = char == text[j - 1]
+            best = prev_score[j - 1] + (ALIGN_MATCH_SCORE if same else ALIGN_MISMATCH_SCORE)
+            best_begin, best_match = prev_begin[j - 1], prev_match[j - 1] + same
+            if prev_score[j] + ALIGN_GAP_SCORE > best:  # sentence char not in text
+                best = prev_score[j] + ALIGN_GAP_SCORE
+                best_begin, best_match = prev_begin[j], prev_match[j]
+            if score[j - 1] + ALIGN_GAP_SCORE > best:  # extra char in text
+                best = score[j - 1] + ALIGN_GAP_SCORE
+                best_begin, best_match = begin[j - 1], match[j - 1]
+            score[j], begin[j], match[j] = best, best_begin, best_match
+        prev_score, prev_begin, prev_match = score, begin, match
+
+    end = max(range(m + 1), key=lambda j: prev_score[j])
+    return prev_begin[end], end, prev_match[end]
+
+
+def align_sentence_timestamps(df_words, df_sentences):
+    """
+    Assign (start, end) times to each sentence, with a confidence score per sentence.
+
+    Exact matches get confidence 1.0. Otherwise the sentence is fuzzily aligned
+    near the cursor; when even that is unreliable, the row is flagged and its times
+    are interpolated between the neighbouring confident sentences instead of
+    aborting the whole stage.
+    """
     time_stamp_list = []
+    confidences = []
 
-    # Build complete string and position mapping
-    full_words_str = ''
-    position_to_word_idx = {}
-
-    for idx, word in enumerate(df_words['text']):
-        clean_word = remove_punctuation(word.lower())
-        start_pos = len(full_words_str)
-        full_words_str += clean_word
-        for pos in range(start_pos, len(full_words_str)):
-            position_to_word_idx[pos] = idx
+    index = WordIndex(df_words['text'])
+    starts = df_words['start'].to_numpy(dtype=float)
+    ends = df_words['end'].to_numpy(dtype=float)
 
     current_pos = 0
+    pending = []  # (row, clean length) of low-confidence rows waiting for the next anchor
+    prev_end_time = float(starts[0]) if len(starts) else 0.0
+
+    def fill_pending(next_start_time):
+        # Share the time between the surrounding anchors by sentence length
+        total = sum(length for _, length in pending) or 1
+        t = prev_end_time
+        step = max(next_start_time - prev_end_time, 0.0) / total
+        for row, length in pending:
+            time_stamp_list[row] = (t, t + length * step)
+            t += length * step
+        pending.clear()
+
     for idx, sentence in df_sentences['Source'].items():
-        clean_sentence = remove_punctuation(sentence.lower()).replace(" ", "")
-        sentence_len = len(clean_sentence)
-
-        match_found = False
-        while current_pos <= len(full_words_str) - sentence_len:
-            if full_words_str[current_pos:current_pos+sentence_len] == clean_sentence:
-                start_word_idx = position_to_word_idx[current_pos]
-                end_word_idx = position_to_word_idx[current_pos + sentence_len - 1]
-
-                time_stamp_list.append((
-                    float(df_words['start'][start_word_idx]),
-                    float(df_words['end'][end_word_idx])
-                ))
-
-                current_pos += sentence_len
-                match_found = True
-                break
-            current_pos += 1
-
-        if not match_found:
-            print(f"\n⚠️ Warning: No exact match found for sentence: {sentence}")
-            show_difference(clean_sentence,
-                          full_words_str[current_pos:current_pos+len(clean_sentence)])
-            print("\nOriginal sentence:", df_sentences['Source'][idx])
-            raise ValueError("❎ No match found for sentence.")
+        clean_sentence = remove_punctuation(str(sentence).lower()).replace(" ", "")
+
+        span = index.find(clean_sentence, current_pos)
+        if span is not None:
+            begin, end = span
+            confidence = 1.0
+        else:
+            # Unplaced rows before this one still occupy text after the cursor
+            skipped = sum(length for _, length in pending)
+            band = max(ALIGN_MIN_BAND, int(len(clean_sentence) * ALIGN_BAND_RATIO)) + skipped
+            window = index.text[current_pos:current_pos + len(clean_sentence) + band]
+            begin, end, matches = banded_align(clean_sentence, window, band)
+            confidence = 2 * matches / (len(clean_sentence) + end - begin) if window else 0.0
+            begin, end = current_pos + begin, current_pos + end
+
+            if confidence < MIN_ALIGN_CONFIDENCE:
+                print(f"\n⚠️ Warning: Low-confidence match ({confidence:.2f}) for sentence: {sentence}")
+                show_difference(clean_sentence, index.text[begin:end])
+                pending.append((len(time_stamp_list), len(clean_sentence)))
+                time_stamp_list.append(None)
+                confidences.append(confidence)
+                continue
+            print(f"ℹ️ Fuzzy match ({confidence:.2f}) for sentence {idx}: {sentence}")
+
+        start_word_idx = index.word_at(begin)
+        end_word_idx = index.word_at(max(end - 1, begin))
+        start_time, end_time = float(starts[start_word_idx]), float(ends[end_word_idx])
+        if pending:
+            fill_pending(start_time)
+        time_stamp_list.append((start_time, end_time))
+        confidences.append(confidence)
+        prev_end_time = end_time
+        current_pos = max(end, current_pos)
+
+    if pending:
+        fill_pending(float(ends[-1]) if len(ends) else prev_end_time)
+
+    flagged = [i for i, c in enumerate(confidences) if c < MIN_ALIGN_CONFIDENCE]
+    if flagged:
+        print(f"⚠️ {len(flagged)} sentence(s) aligned with low confidence, timestamps interpolated: rows {flagged}")
+
+    return time_stamp_list, confidences
 
+
+def get_sentence_timestamps(df_words, df_sentences):
+    time_stamp_list, _ = align_sentence_timestamps(df_words, df_sentences)
     return time_stamp_list
 
 
+def remove_gaps(start, end, max_gap=1):
+    """Extend each cue's end to the next cue's start when the gap between them is under max_gap seconds"""
+    next_start = np.append(start[1:], np.nan)
+    delta = next_start - end
+    return np.where((delta > 0) & (delta < max_gap), next_start, end)
+
+
 def align_timestamp(df_text, df_translate, subtitle_output_configs: list, output_dir: str, for_display: bool = True):
     """Align timestamps and add a new timestamp column to df_translate"""
     df_trans_time = df_translate.copy()
 
-    # Assign an ID to each word in df_text['text'] and create a new DataFrame
-    words = df_text['text'].str.split(expand=True).stack().reset_index(level=1, drop=True).reset_index()
-    words.columns = ['id', 'word']
-    words['id'] = words['id'].astype(int)
-
-    # Process timestamps ⏰
-    time_stamp_list = get_sentence_timestamps(df_text, df_translate)
-    df_trans_time['timestamp'] = time_stamp_list
-    df_trans_time['duration'] = df_trans_time['timestamp'].apply(lambda x: x[1] - x[0])
+    # Process timestamps ⏰ (low-confidence rows are kept in the output for review)
+    time_stamp_list, confidences = align_sentence_timestamps(df_text, df_translate)
+    times = np.array(time_stamp_list, dtype=float).reshape(-1, 2)
+    start, end = times[:, 0], times[:, 1]
+    duration = end - start
 
     # Remove gaps 🕳️
-    for i in range(len(df_trans_time)-1):
-        delta_time = df_trans_time.loc[i+1, 'timestamp'][0] - df_trans_time.loc[i, 'timestamp'][1]
-        if 0 < delta_time < 1:
-            df_trans_time.at[i, 'timestamp'] = (df_trans_time.loc[i, 'timestamp'][0], df_trans_time.loc[i+1, 'timestamp'][0])
+    end = remove_gaps(start, end)
 
     # Convert start and end timestamps to SRT format
-    df_trans_time['timestamp'] = df_trans_time['timestamp'].apply(lambda x: convert_to_srt_format(x[0], x[1]))
+    df_trans_time['timestamp'] = [f"{s} --> {e}" for s, e in zip(format_srt_times(start), format_srt_times(end))]
+    df_trans_time['duration'] = duration
+    df_trans_time['confidence'] = confidences
 
     # Polish subtitles: replace punctuation in Translation if for_display
     if for_display:
-        df_trans_time['Translation'] = df_trans_time['Translation'].apply(lambda x: re.sub(r'[，。]', ' ', x).strip())
-
-    # Output subtitles 📜
-    def generate_subtitle_string(df, columns):
-        return ''.join([f"{i+1}\n{row['timestamp']}\n{row[columns[0]].strip()}\n{row[columns[1]].strip() if len(columns) > 1 else ''}\n\n" for i, row in df.iterrows()]).strip()
+        df_trans_time['Translation'] = df_trans_time['Translation'].str.replace(r'[，。]', ' ', regex=True).str.strip()
 
+    # Output subtitles 📜 (the extension of each config picks SRT/VTT/ASS/JSON)
     if output_dir:
-        os.makedirs(output_dir, exist_ok=True)
-        for filename, columns in subtitle_output_configs:
-            subtitle_str = generate_subtitle_string(df_trans_time, columns)
-            with open(os.path.join(output_dir, filename), 'w', encoding='utf-8') as f:
-                f.write(subtitle_str)
+        write_subtitles(df_trans_time.assign(start=start, end=end), subtitle_output_configs, output_dir)
 
     return df_trans_time
-
@@ -0,0 +1,87 @@
+"""Aho-Corasick matcher for finding terminology entries in text."""
+import re
+from collections import deque
+
+_WORD_CHAR = re.compile(r'\w')
+
+
+class TermMatcher:
+    """
+    Multi-pattern matcher built once from a list of terms.
+
+    All terms are matched in a single linear pass over the text, regardless
+    of how many terms the automaton holds.
+
+    Args:
+        terms: List of term strings (duplicates allowed)
+        case_sensitive: Match terms with exact case when True
+        word_boundary: Only accept matches not surrounded by word characters
+    """
+
+    def __init__(self, terms, case_sensitive=False, word_boundary=False):
+        self.case_sensitive = case_sensitive
+        self.word_boundary = word_boundary
+        self.size = len(terms)
+        # node -> {char: node}, failure link, and term ids ending at node
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        for term_id, term in enumerate(terms):
+            self._add(self._normalize(str(term)), term_id)
+        self._build()
+
+    def _normalize(self, text):
+        return text if self.case_sensitive else text.lower()
+
+    def _add(self, pattern, term_id):
+        if not pattern:
+            return
+        node = 0
+        for char in pattern:
+            nxt = self._goto[node].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][char] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append((term_id, len(pattern)))
+
+    def _build(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, nxt in self._goto[node].items():
+                queue.append(nxt)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(char, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def _is_boundary(self, text, start, end):
+        if start > 0 and _WORD_CHAR.match(text[start - 1]):
+            return False
+        if end < len(text) and _WORD_CHAR.match(text[end]):
+            return False
+        return True
+
+    def find_all(self, text):
+        """Yield (term_id, start, end) for every match in text."""
+        text = self._normalize(text)
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for pos, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for term_id, length in out[node]:
+                start = pos + 1 - length
+                if self.word_boundary and not self._is_boundary(text, start, pos + 1):
+                    continue
+                yield term_id, start, pos + 1
+
+    def match_ids(self, text):
+        """Return the sorted ids of all terms that occur in text."""
+        return sorted({term_id for term_id, _, _ in self.find_all(text)})
@@ -1,29 +1,24 @@
 import re
+import concurrent.futures
 from rich.console import Console
 from rich.panel import Panel
-from core.prompts import get_subtitle_trim_prompt
-from core.tts_backend.estimate_duration import init_estimator, estimate_duration
+from core.prompts import get_subtitle_trim_prompt, get_subtitle_trim_batch_prompt
+from core.tts_backend.estimate_duration import get_estimator, estimate_duration
+from core.tts_backend.calibration import get_speech_rates
 from core.utils import ask_gpt, load_key, rprint
 
 console = Console()
 
-# Global estimator cache
-ESTIMATOR = None
-
 
 def check_len_then_trim(text, duration):
     """Check if the text's estimated reading duration exceeds the given duration, and trim if necessary."""
-    global ESTIMATOR
-
     speed_factor = {
         "min": load_key("speed_factor.min"),
         "accept": load_key("speed_factor.accept"),
         "max": load_key("speed_factor.max")
     }
 
-    if ESTIMATOR is None:
-        ESTIMATOR = init_estimator()
-    estimated_duration = estimate_duration(text, ESTIMATOR) / speed_factor['max']
+    estimated_duration = estimate_duration(text, get_estimator(), get_speech_rates()) / speed_factor['max']
 
     console.print(f"Subtitle text: {text}, "
                   f"[bold green]Estimated reading duration: {estimated_duration:.2f} seconds[/bold green]")
@@ -43,10 +38,62 @@ def check_len_then_trim(text, duration):
             shortened_text = response['result']
         except Exception:
             rprint("[bold red]🚫 AI refused to answer due to sensitivity, so manually remove punctuation[/bold red]")
-            shortened_text = re.sub(r'[,.!?;:，。！？；：]', ' ', text).strip()
+            shortened_text = remove_trim_punctuation(text)
 
         rprint(Panel(f"Subtitle before shortening: {original_text}\nSubtitle after shortening: {shortened_text}", title="Subtitle Shortening Result", border_style="green"))
         return shortened_text
     else:
         return text
 
+
+# Over-long subtitles shortened together in one trim request
+TRIM_BATCH_SIZE = 10
+
+
+def remove_trim_punctuation(text):
+    """Last-resort shortening when the LLM cannot trim a subtitle"""
+    return re.sub(r'[,.!?;:，。！？；：]', ' ', text).strip()
+
+
+def trim_batch(items):
+    """Shorten several subtitles with one GPT request; items are (index, text, duration)"""
+    prompt = get_subtitle_trim_batch_prompt([(str(i), text, duration) for i, text, duration in items])
+
+    def valid_trim_batch(response):
+        for i, _, _ in items:
+            result = response.get(str(i))
+            if not isinstance(result, dict) or not str(result.get('result', '')).strip():
+                return {'status': 'error', 'message': f'No result for subtitle {i}'}
+        return {'status': 'success', 'message': ''}
+
+    try:
+        response = ask_gpt(prompt, resp_type='json', log_title='sub_trim_batch', valid_def=valid_trim_batch)
+        return {i: str(response[str(i)]['result']).strip() for i, _, _ in items}
+    except Exception:
+        rprint(f"[bold red]🚫 Batch trim failed, trimming {len(items)} subtitle(s) one by one[/bold red]")
+        return {i: check_len_then_trim(text, duration) for i, text, duration in items}
+
+
+def check_len_then_trim_many(texts, durations, max_workers=None):
+    """
+    Batch version of check_len_then_trim: estimate all lines at once, then shorten the
+    over-long ones in grouped, concurrent trim requests. Returns the texts in input order.
+    """
+    texts, durations = list(texts), list(durations)
+    speed_max = load_key("speed_factor.max")
+    estimated = get_estimator().estimate_many(texts, get_speech_rates())
+    too_long = [(i, texts[i], durations[i]) for i, est in enumerate(estimated) if est / speed_max > durations[i]]
+    if not too_long:
+        return texts
+
+    rprint(Panel(f"{len(too_long)} of {len(texts)} subtitles exceed their duration, shortening...", title="Processing", border_style="yellow"))
+    batches = [too_long[i:i + TRIM_BATCH_SIZE] for i in range(0, len(too_long), TRIM_BATCH_SIZE)]
+    results = list(texts)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers or load_key("max_workers")) as executor:
+        for trimmed in executor.map(trim_batch, batches):
+            for i, text in trimmed.items():
+                results[i] = text
+
+    for i, text, _ in too_long:
+        console.print(f"[green]✂️ {text}[/green] → [bold green]{results[i]}[/bold green]")
+    return results